@@ -1,41 +1,92 @@
 #!/usr/bin/env python3
+import copy
 import json
 import os
-import argparse
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+# Use orjson for config (de)serialization if available
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+def _dump_json(config, compact=False):
+    """Serialize config to UTF-8 bytes
+    
+    orjson only offers 2-space indentation, so the pretty-printed (default)
+    layout stays on the stdlib to keep the familiar 4-space config format.
+    """
+    if compact:
+        if HAS_ORJSON:
+            return orjson.dumps(config)
+        return json.dumps(config, separators=(",", ":")).encode("utf-8")
+    return json.dumps(config, indent=4).encode("utf-8")
+
+# Default empty config; tuples are turned into fresh lists on each use
+_DEFAULT_CONFIG = {
+    "sources": (),
+    "download_limit": 10,
+    "min_delay": 1,
+    "max_delay": 3,
+    "categories": ("action", "fight", "emotional", "comedy")
+}
+
+@lru_cache(maxsize=8)
+def _load_cached(path, mtime):
+    """Parse a config file; keyed on mtime so edits invalidate the entry"""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+def _make_default_config():
+    """Build a fresh, mutable copy of the default config"""
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in _DEFAULT_CONFIG.items()
+    }
+
 def load_config(config_file):
     """Load the configuration file or create with defaults"""
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            return json.load(f)
-    else:
-        # Default empty config
-        default_config = {
-            "sources": [],
-            "download_limit": 10,
-            "min_delay": 1,
-            "max_delay": 3,
-            "categories": ["action", "fight", "emotional", "comedy"]
-        }
-        with open(config_file, 'w') as f:
-            json.dump(default_config, f, indent=4)
+    try:
+        mtime = os.stat(config_file).st_mtime_ns
+        # Hand out a copy so callers can mutate it without poisoning the cache
+        return copy.deepcopy(_load_cached(os.path.abspath(config_file), mtime))
+    except FileNotFoundError:
+        default_config = _make_default_config()
+        _write_config(default_config, config_file)
         return default_config
 
-def save_config(config, config_file):
+def _write_config(config, config_file, compact=False):
+    """Write the config to a temporary file and os.replace it into place,
+    so an interrupted write never leaves a truncated config behind"""
+    tmp_file = f"{config_file}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(_dump_json(config, compact))
+    os.replace(tmp_file, config_file)
+
+def save_config(config, config_file, compact=False):
     """Save configuration to file"""
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=4)
+    _write_config(config, config_file, compact)
     print(f"Configuration saved to {config_file}")
 
+def _name_index(config):
+    """Map each configured source name to its position in config["sources"]"""
+    return {source["name"]: i for i, source in enumerate(config["sources"])}
+
 def add_html_source(config, name, base_url, clip_selector, link_selector, 
-                  next_page_selector=None, page_param=None, max_pages=3):
+                  next_page_selector=None, page_param=None, max_pages=3, name_index=None):
     """Add a new HTML-based source to the configuration"""
+    if name_index is None:
+        name_index = _name_index(config)
+    
     # Check if source already exists
-    for source in config["sources"]:
-        if source["name"] == name:
-            print(f"Source with name '{name}' already exists. Please use a unique name.")
-            return False
+    if name in name_index:
+        print(f"Source with name '{name}' already exists. Please use a unique name.")
+        return False
     
     new_source = {
         "name": name,
@@ -52,16 +103,19 @@ def add_html_source(config, name, base_url, clip_selector, link_selector,
     
     new_source["max_pages"] = max_pages
     
+    name_index[name] = len(config["sources"])
     config["sources"].append(new_source)
     return True
 
-def add_api_source(config, name, base_url, max_items=20):
+def add_api_source(config, name, base_url, max_items=20, name_index=None):
     """Add a new API-based source to the configuration"""
+    if name_index is None:
+        name_index = _name_index(config)
+    
     # Check if source already exists
-    for source in config["sources"]:
-        if source["name"] == name:
-            print(f"Source with name '{name}' already exists. Please use a unique name.")
-            return False
+    if name in name_index:
+        print(f"Source with name '{name}' already exists. Please use a unique name.")
+        return False
     
     new_source = {
         "name": name,
@@ -70,16 +124,69 @@ def add_api_source(config, name, base_url, max_items=20):
         "max_items": max_items
     }
     
+    name_index[name] = len(config["sources"])
     config["sources"].append(new_source)
     return True
 
-def main():
-    parser = argparse.ArgumentParser(description="Add a new source to Anime Clip Scraper")
-    parser.add_argument("--config", "-c", help="Config file path", default="config.json")
+def add_sources(config, specs):
+    """Add several sources at once, building the name index only once
     
-    subparsers = parser.add_subparsers(dest="source_type", help="Type of source to add")
+    Each spec is a dict with a "type" key ("html" or "api") plus the keyword
+    arguments of add_html_source / add_api_source. Returns the number of
+    sources that were added.
+    """
+    name_index = _name_index(config)
+    added = 0
     
-    # HTML parser
+    for spec in specs:
+        spec = dict(spec)
+        source_type = spec.pop("type", "html")
+        if source_type == "api":
+            success = add_api_source(config, name_index=name_index, **spec)
+        else:
+            success = add_html_source(config, name_index=name_index, **spec)
+        if success:
+            added += 1
+    
+    return added
+
+def _parse_list_invocation(argv):
+    """Return the config path if argv is a plain `list` invocation, else None
+    
+    Only the global --config/-c and --compact flags are recognised; anything
+    else (including -h) falls through to the full argparse tree.
+    """
+    config_file = "config.json"
+    command = None
+    tokens = iter(argv)
+    
+    for token in tokens:
+        if token in ("--config", "-c"):
+            config_file = next(tokens, None)
+            if config_file is None:
+                return None
+        elif token.startswith("--config="):
+            config_file = token.split("=", 1)[1]
+        elif token == "--compact":
+            continue
+        elif command is None and token == "list":
+            command = token
+        else:
+            return None
+    
+    return config_file
+
+def _print_sources(config):
+    """Print all configured sources with a single write"""
+    lines = ["Configured sources:"]
+    lines.extend(
+        f"{i}. {source['name']} ({'API' if source.get('is_api') else 'HTML'}): {source['base_url']}"
+        for i, source in enumerate(config["sources"], 1)
+    )
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+
+def _build_html_parser(subparsers):
     html_parser = subparsers.add_parser("html", help="Add an HTML-based source")
     html_parser.add_argument("--name", required=True, help="Name of the source")
     html_parser.add_argument("--url", required=True, help="Base URL of the source")
@@ -88,15 +195,31 @@ def main():
     html_parser.add_argument("--next-page", help="CSS selector for the next page link")
     html_parser.add_argument("--page-param", help="URL parameter format for pagination (e.g., 'page={}')")
     html_parser.add_argument("--max-pages", type=int, default=3, help="Maximum number of pages to scrape")
-    
-    # API parser
+
+def _build_api_parser(subparsers):
     api_parser = subparsers.add_parser("api", help="Add an API-based source")
     api_parser.add_argument("--name", required=True, help="Name of the source")
     api_parser.add_argument("--url", required=True, help="Base URL of the API endpoint")
     api_parser.add_argument("--max-items", type=int, default=20, help="Maximum number of items to retrieve")
+
+def main():
+    # Listing sources is the common case and needs none of the argparse tree
+    config_file = _parse_list_invocation(sys.argv[1:])
+    if config_file is not None:
+        _print_sources(load_config(config_file))
+        return
+    
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Add a new source to Anime Clip Scraper")
+    parser.add_argument("--config", "-c", help="Config file path", default="config.json")
+    parser.add_argument("--compact", action="store_true", help="Write the config without indentation")
+    
+    subparsers = parser.add_subparsers(dest="source_type", help="Type of source to add")
     
-    # List parser
-    list_parser = subparsers.add_parser("list", help="List all configured sources")
+    _build_html_parser(subparsers)
+    _build_api_parser(subparsers)
+    subparsers.add_parser("list", help="List all configured sources")
     
     args = parser.parse_args()
     
@@ -115,7 +238,7 @@ def main():
             args.max_pages
         )
         if success:
-            save_config(config, config_file)
+            save_config(config, config_file, compact=args.compact)
             print(f"HTML source '{args.name}' added successfully.")
     
     elif args.source_type == "api":
@@ -126,14 +249,11 @@ def main():
             args.max_items
         )
         if success:
-            save_config(config, config_file)
+            save_config(config, config_file, compact=args.compact)
             print(f"API source '{args.name}' added successfully.")
     
     elif args.source_type == "list" or not args.source_type:
-        print("Configured sources:")
-        for i, source in enumerate(config["sources"], 1):
-            source_type = "API" if source.get("is_api", False) else "HTML"
-            print(f"{i}. {source['name']} ({source_type}): {source['base_url']}")
+        _print_sources(config)
     
     else:
         parser.print_help()
@@ -1,24 +1,192 @@
 #!/usr/bin/env python3
 import os
 import re
+import sys
 import argparse
+import hashlib
 import json
 from pathlib import Path
 import random
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from urllib.parse import urlparse, urljoin
 
 import requests
-from bs4 import BeautifulSoup
-import yt_dlp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Import super resolution if available
+# Use orjson for API responses, the config and the clip cache if available
 try:
-    from super_resolution import SuperResolution, HAS_REALESRGAN
+    import orjson
+    HAS_ORJSON = True
 except ImportError:
-    HAS_REALESRGAN = False
+    HAS_ORJSON = False
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+def _json_dumps(obj):
+    """Serialize obj to compact UTF-8 JSON bytes"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# Keep an on-disk HTTP cache of scraped pages if requests-cache is available
+try:
+    from requests_cache import CachedSession
+    HAS_REQUESTS_CACHE = True
+except ImportError:
+    HAS_REQUESTS_CACHE = False
+
+# Prefer selectolax for HTML parsing (lexbor backend, or modest on older
+# releases that lack it); both share the css()/attributes API. Fall back to BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+# Without selectolax, use lxml directly (CSS selectors compiled to XPath once)
+# rather than wrapping it in BeautifulSoup
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Optionally fetch listing pages over HTTP/2 with httpx (config "http_backend": "httpx")
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+# yt_dlp, bs4 and super_resolution (torch, cv2) are heavy to import, so they
+# are imported where they are used rather than at startup
+
+def _load_super_resolution():
+    """Import the super resolution module on first use
+    
+    Returns the SuperResolution class, or None if its dependencies are missing.
+    """
+    try:
+        from super_resolution import SuperResolution, HAS_REALESRGAN
+    except ImportError:
+        return None
+    return SuperResolution if HAS_REALESRGAN else None
+
+# Extensions (lowercase, without the dot) used to classify clip URLs
+_VIDEO_EXTS = frozenset({'mp4', 'webm', 'mkv'})
+_IMAGE_EXTS = frozenset({'gif', 'jpg', 'jpeg', 'png'})
+_MEDIA_EXTS = _VIDEO_EXTS | _IMAGE_EXTS
+_CLIP_EXTS = frozenset({'mp4', 'webm', 'gif'})
+
+def _url_ext(url):
+    """Return the lowercased extension (without the dot) of a URL's path
+    
+    Query strings and fragments are ignored, so ".../DASH_720.mp4?source=fallback"
+    is an mp4 and "...?format=mp4" is not.
+    """
+    return os.path.splitext(urlparse(url).path)[1][1:].lower()
+
+def _parse_html(response):
+    """Parse an HTML response body with the fastest available backend
+    
+    The raw bytes are handed to the parser, which decodes them in C, instead of
+    materializing response.text first.
+    """
+    # Only trust the charset the server actually declared; requests otherwise
+    # falls back to ISO-8859-1 for text/* responses
+    encoding = None
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        encoding = response.encoding
+    
+    markup = response.content
+    if HAS_SELECTOLAX:
+        # selectolax expects UTF-8 bytes, so only decode up front for other charsets
+        if encoding and encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            markup = markup.decode(encoding, errors='replace')
+        return SelectolaxParser(markup)
+    
+    if HAS_LXML:
+        # Decode in C up front so libxml2 never has to guess the charset
+        return lxml.html.document_fromstring(markup.decode(encoding or 'utf-8', errors='replace'))
+    
+    from bs4 import BeautifulSoup, FeatureNotFound
+    try:
+        return BeautifulSoup(markup, 'lxml', from_encoding=encoding or 'utf-8')
+    except FeatureNotFound:
+        # lxml isn't installed; the stdlib parser is slower but always available
+        return BeautifulSoup(markup, 'html.parser', from_encoding=encoding or 'utf-8')
+
+@lru_cache(maxsize=64)
+def _css_selector(selector):
+    """Compile a CSS selector to an lxml XPath evaluator, once per selector string"""
+    return CSSSelector(selector)
+
+def _select_all(node, selector):
+    """Return all nodes under node matching a CSS selector"""
+    if HAS_SELECTOLAX:
+        return node.css(selector)
+    if HAS_LXML:
+        return _css_selector(selector)(node)
+    return node.select(selector)
+
+def _select_first(node, selector):
+    """Return the first node under node matching a CSS selector, or None"""
+    if HAS_SELECTOLAX:
+        return node.css_first(selector)
+    if HAS_LXML:
+        matches = _css_selector(selector)(node)
+        return matches[0] if matches else None
+    return node.select_one(selector)
+
+def _get_attr(node, name):
+    """Return an attribute value of node, or None if it is missing"""
+    # lxml elements and BeautifulSoup tags both expose attributes through get()
+    return node.attributes.get(name) if HAS_SELECTOLAX else node.get(name)
+
+class HostThrottle:
+    """Space out requests to the same host by a random delay
+    
+    Requests to different hosts never wait on each other, and only the thread
+    that is about to hit a host sleeps, so other sources keep making progress.
+    """
+    def __init__(self, min_delay, max_delay):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, url):
+        """Block until a request to url's host is allowed"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = start + random.uniform(self.min_delay, self.max_delay)
+        
+        if start > now:
+            time.sleep(start - now)
 
 class AnimeClipScraper:
+    # Compiled once; used to sanitize every downloaded clip's filename
+    _TITLE_RE = re.compile(r'[^\w\-_. ]')
+    _FN_RE = re.compile(r'[^\w\-_.]')
+    # File names shared by many clips (v.redd.it's DASH_720.mp4, Tenor's tenor.gif);
+    # the unique part of those URLs is the parent path segment
+    _GENERIC_STEM_RE = re.compile(r'^(?:DASH_\w+|tenor|video|audio|index|default)$', re.IGNORECASE)
+    # GIF ID segment of a Tenor media URL (.../images/<id>/...)
+    _TENOR_ID_RE = re.compile(r'/images/([^/?#]+)')
+    
     def __init__(self, output_dir="downloads", config_file="config.json"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -30,9 +198,85 @@ class AnimeClipScraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         
+        # Scrape results and listing pages are cached for cache_expire seconds (0 disables)
+        self.cache_dir = self.output_dir / ".cache"
+        self.cache_expire = self.config.get("cache_expire", 3600)
+        # When set, cached pages and results are ignored (but still refreshed)
+        self.force_refresh = False
+        
+        # Share keep-alive connection pools (with retries) across all requests.
+        # Listing pages go through the (optionally cached) page session, while
+        # media downloads use a plain session so large files never hit the cache.
+        self.http_cache = HAS_REQUESTS_CACHE and bool(self.cache_expire)
+        if self.http_cache:
+            self.cache_dir.mkdir(exist_ok=True)
+            self.session = CachedSession(
+                cache_name=str(self.cache_dir / "http_cache"),
+                backend="sqlite",
+                expire_after=self.cache_expire,
+                cache_control=True
+            )
+        else:
+            self.session = requests.Session()
+        self.download_session = requests.Session()
+        
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        for session in (self.session, self.download_session):
+            session.headers.update(self.headers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        
+        # Seconds to wait for a connection or for the next bytes of a response,
+        # so one stalled server can't hang a worker forever
+        self.request_timeout = self.config.get("request_timeout", 30)
+        
+        # With the httpx backend, listing pages (not downloads) share one multiplexed
+        # HTTP/2 connection per host. It bypasses requests-cache, so Reddit falls back
+        # to its own ETag revalidation
+        self.http_client = None
+        if self.config.get("http_backend", "requests") == "httpx":
+            if HAS_HTTPX:
+                try:
+                    self.http_client = httpx.Client(
+                        http2=True,
+                        headers=self.headers,
+                        follow_redirects=True,
+                        timeout=self.request_timeout,
+                        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+                    )
+                    self.http_cache = False
+                except ImportError:
+                    print("HTTP/2 requires the h2 package (pip install httpx[http2]), using requests instead")
+            else:
+                print("httpx is not installed, using requests instead")
+        
+        # Bound the number of in-flight requests and rate limit each host
+        self._request_slots = threading.BoundedSemaphore(max(1, int(self.config.get("max_concurrency", 5))))
+        self.throttle = HostThrottle(self.config["min_delay"], self.config["max_delay"])
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # One reusable YoutubeDL per download thread (building one loads every extractor)
+        self._ydl_local = threading.local()
+        self._downloaders = []
+        self._downloaders_lock = threading.Lock()
+        
+        # Scraper method for each supported source name
+        self._scrapers = {
+            "sakugabooru": self.scrape_sakugabooru,
+            "animeclips_reddit": self.scrape_reddit,
+            "tenor_anime": self.scrape_tenor,
+            "youtube_anime": self.scrape_youtube,
+        }
+        
         # Initialize super resolution if enabled
         self.super_resolution = None
-        if self.config.get("enhance_videos", False) and HAS_REALESRGAN:
+        SuperResolution = _load_super_resolution() if self.config.get("enhance_videos", False) else None
+        if SuperResolution:
             try:
                 self.super_resolution = SuperResolution(
                     model_name=self.config.get("sr_model", "realesr-animevideov3"),
@@ -48,8 +292,8 @@ class AnimeClipScraper:
     def load_config(self):
         """Load configuration from JSON file or create default"""
         if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                self.config = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                self.config = _json_loads(f.read())
         else:
             # Default configuration
             self.config = {
@@ -88,108 +332,235 @@ class AnimeClipScraper:
                 "download_limit": 10,
                 "min_delay": 1,
                 "max_delay": 3,
+                "max_concurrency": 5,  # Maximum number of listing requests in flight at once
+                "request_timeout": 30,  # Seconds before a stalled connection or read is abandoned
+                "max_download_concurrency": 8,  # Maximum number of clips downloaded at once
+                "http_backend": "requests",  # "requests", or "httpx" for HTTP/2 listing requests
                 "categories": ["action", "fight", "emotional", "comedy"],
                 "prefer_video": True,  # Prefer video content over GIFs
                 "enhance_videos": False,  # Whether to enhance videos with super resolution
                 "sr_model": "realesr-animevideov3",  # Super resolution model
                 "sr_scale": 2,  # Scale factor for super resolution
                 "sr_denoise": 0.5,  # Denoise strength for super resolution
-                "sr_device": "auto"  # Device for super resolution (auto, cuda, cpu)
+                "sr_device": "auto",  # Device for super resolution (auto, cuda, cpu)
+                "cache_expire": 3600  # Seconds to reuse cached listing pages and results (0 disables)
             }
             self.save_config()
     
     def save_config(self):
         """Save current configuration to file"""
+        # Written with the stdlib: orjson can't produce the 4-space layout users edit by hand
         with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=4)
     
-    def random_delay(self):
-        """Add random delay between requests to avoid rate limiting"""
-        delay = random.uniform(self.config["min_delay"], self.config["max_delay"])
-        time.sleep(delay)
+    def fetch(self, url, headers=None, **kwargs):
+        """GET a URL, respecting the concurrency bound and per-host rate limit"""
+        kwargs.setdefault("timeout", self.request_timeout)
+        
+        client = self.session
+        if self.http_client is not None:
+            client = self.http_client
+        elif self.force_refresh and self.http_cache:
+            kwargs["force_refresh"] = True
+        
+        # Answer from the HTTP cache without paying the per-host delay when we can;
+        # only requests that actually go out to the network are throttled
+        if self.http_cache and self.http_client is None and not self.force_refresh:
+            with self._request_slots:
+                response = client.get(url, headers=headers, only_if_cached=True, **kwargs)
+            if response.status_code != 504:  # requests-cache's "not cached" response
+                return response
+        
+        self.throttle.wait(url)
+        with self._request_slots:
+            return client.get(url, headers=headers, **kwargs)
+    
+    def _clip_cache_path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+    
+    def load_cached_clips(self, key):
+        """Return the clips cached under key, or None if missing or expired"""
+        if not self.cache_expire or self.force_refresh:
+            return None
+        
+        cache_path = self._clip_cache_path(key)
+        try:
+            if time.time() - cache_path.stat().st_mtime > self.cache_expire:
+                return None
+            with open(cache_path, 'rb') as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def store_cached_clips(self, key, clips):
+        """Cache the clips extracted for key"""
+        if not self.cache_expire:
+            return
+        
+        self.cache_dir.mkdir(exist_ok=True)
+        with open(self._clip_cache_path(key), 'wb') as f:
+            f.write(_json_dumps(clips))
+    
+    def load_etag_entry(self, key):
+        """Return the {"etag", "clips"} entry saved for key, or None
+        
+        Unlike load_cached_clips this never expires: the server decides whether
+        the entry is still valid when it is sent back as If-None-Match.
+        """
+        if not self.cache_expire or self.force_refresh:
+            return None
+        
+        try:
+            with open(self._clip_cache_path(key), 'rb') as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+    
+    def store_etag_entry(self, key, etag, clips):
+        """Save the clips extracted from a response along with its ETag"""
+        if not self.cache_expire:
+            return
+        
+        self.cache_dir.mkdir(exist_ok=True)
+        with open(self._clip_cache_path(key), 'wb') as f:
+            f.write(_json_dumps({"etag": etag, "clips": clips}))
     
     def scrape_sakugabooru(self, source):
-        """Scrape anime clips from Sakugabooru"""
+        """Scrape anime clips from Sakugabooru, reusing recent results if cached"""
+        cache_key = json.dumps([source, self.config["download_limit"]], sort_keys=True)
+        clips = self.load_cached_clips(cache_key)
+        if clips is not None:
+            print(f"Using cached results for {source['name']}")
+            return clips
+        
+        clips, complete = self._scrape_sakugabooru_pages(source)
+        # Don't let a failed page (403, 503, ...) pin a short or empty result in the cache
+        if complete:
+            self.store_cached_clips(cache_key, clips)
+        return clips
+    
+    def _scrape_sakugabooru_pages(self, source):
+        """Scrape anime clips from Sakugabooru listing pages
+        
+        Returns (clips, complete), where complete is False if a page failed to load.
+        """
         clips = []
-        current_page = 1
+        complete = True
+        limit = self.config["download_limit"]
         
-        while current_page <= source["max_pages"]:
-            url = source["base_url"]
-            if current_page > 1:
-                url = f"{url}&{source['page_param'].format(current_page)}"
-            
-            print(f"Scraping {source['name']} page {current_page}...")
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code != 200:
-                print(f"Failed to fetch {url}, status code: {response.status_code}")
-                break
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            clip_elements = soup.select(source["clip_selector"])
+        # The page URLs are known up front, so the next page can be fetched while
+        # the current one is parsed; at most one page is requested ahead
+        urls = [source["base_url"]]
+        for page in range(2, source["max_pages"] + 1):
+            urls.append(f"{source['base_url']}&{source['page_param'].format(page)}")
+        
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = None
+        try:
+            future = executor.submit(self.fetch, urls[0])
             
-            for element in clip_elements:
-                try:
-                    # Extract video link
-                    link_element = element.select_one(source["link_selector"])
-                    if not link_element:
-                        continue
-                    
-                    link = link_element.get('href')
-                    if not link:
-                        continue
-                    
-                    # Only get video files
-                    if any(ext in link.lower() for ext in ['.mp4', '.webm', '.gif']):
-                        # Make URL absolute if needed
-                        if not urlparse(link).netloc:
-                            link = urljoin(source["base_url"], link)
+            for current_page, url in enumerate(urls, 1):
+                print(f"Scraping {source['name']} page {current_page}...")
+                response = future.result()
+                future = None
+                
+                if response.status_code != 200:
+                    print(f"Failed to fetch {url}, status code: {response.status_code}")
+                    complete = False
+                    break
+                
+                tree = _parse_html(response)
+                clip_elements = _select_all(tree, source["clip_selector"])
+                next_page = _select_first(tree, source["next_page_selector"])
+                has_next = next_page is not None and current_page < len(urls)
+                
+                # Prefetch the next page, unless this one may already fill the limit
+                if has_next and len(clips) + len(clip_elements) < limit:
+                    future = executor.submit(self.fetch, urls[current_page])
+                
+                for element in clip_elements:
+                    try:
+                        # Extract video link
+                        link_element = _select_first(element, source["link_selector"])
+                        if link_element is None:
+                            continue
                         
-                        # Get tags if available
-                        tags = []
-                        tags_element = element.get('data-tags')
-                        if tags_element:
-                            tags = tags_element.split()
+                        link = _get_attr(link_element, 'href')
+                        if not link:
+                            continue
                         
-                        clips.append({
-                            "source": source["name"],
-                            "url": link,
-                            "tags": tags
-                        })
-                except Exception as e:
-                    print(f"Error processing clip element: {str(e)}")
-            
-            # Check if we've reached the limit
-            if len(clips) >= self.config["download_limit"]:
-                break
-            
-            # Find next page link
-            next_page = soup.select_one(source["next_page_selector"])
-            if not next_page:
-                break
-            
-            current_page += 1
-            self.random_delay()
+                        # Only get video files
+                        if _url_ext(link) in _CLIP_EXTS:
+                            # Make URL absolute if needed
+                            if not urlparse(link).netloc:
+                                link = urljoin(source["base_url"], link)
+                            
+                            # Get tags if available
+                            tags = []
+                            tags_element = _get_attr(element, 'data-tags')
+                            if tags_element:
+                                tags = tags_element.split()
+                            
+                            clips.append({
+                                "source": source["name"],
+                                "url": link,
+                                "tags": tags
+                            })
+                            
+                            # Stop building clips for the rest of the page once we have enough
+                            if len(clips) >= limit:
+                                break
+                    except Exception as e:
+                        print(f"Error processing clip element: {str(e)}")
+                
+                # Check if we've reached the limit
+                if len(clips) >= limit:
+                    break
+                
+                # Stop at the last page
+                if not has_next:
+                    break
+                if future is None:
+                    future = executor.submit(self.fetch, urls[current_page])
+        finally:
+            # Don't wait on a prefetch we no longer need
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
         
-        return clips[:self.config["download_limit"]]
+        return clips[:limit], complete
     
     def scrape_reddit(self, source):
         """Scrape anime clips from Reddit"""
         clips = []
         
         # Reddit requires a JSON request
-        headers = self.headers.copy()
-        headers["Accept"] = "application/json"
+        headers = {"Accept": "application/json"}
+        
+        # requests-cache revalidates with ETags itself; without it, send our own
+        # conditional GET and reuse the clips from last time on a 304
+        etag_key = None
+        etag_entry = None
+        if not self.http_cache:
+            etag_key = json.dumps(["etag", source, self.config["download_limit"]], sort_keys=True)
+            etag_entry = self.load_etag_entry(etag_key)
+            if etag_entry:
+                headers["If-None-Match"] = etag_entry["etag"]
+        
+        response = self.fetch(source["base_url"], headers=headers)
+        if response.status_code == 304 and etag_entry:
+            print(f"{source['name']} not modified, reusing {len(etag_entry['clips'])} cached clips")
+            return etag_entry["clips"]
         
-        response = requests.get(source["base_url"], headers=headers)
         if response.status_code != 200:
             print(f"Failed to fetch {source['base_url']}, status code: {response.status_code}")
             return clips
         
-        data = response.json()
+        data = _json_loads(response.content)
         posts = data.get("data", {}).get("children", [])
         
-        for post in posts[:source["max_items"]]:
+        for post in islice(posts, source["max_items"]):
             post_data = post.get("data", {})
             url = post_data.get("url")
             
@@ -197,14 +568,16 @@ class AnimeClipScraper:
             if not url or "gallery" in url:
                 continue
             
-            # For v.redd.it links, get the actual media URL
+            # Cheap string checks first: only v.redd.it posts need the media dict walk
             if "v.redd.it" in url:
-                fallback_url = post_data.get("secure_media", {}).get("reddit_video", {}).get("fallback_url")
-                if fallback_url:
-                    url = fallback_url
+                # For v.redd.it links, get the actual media URL
+                try:
+                    url = post_data["secure_media"]["reddit_video"]["fallback_url"] or url
+                except (KeyError, TypeError):
+                    continue
             
             # Direct links to images and videos
-            if url.endswith(('.mp4', '.gif', '.webm', '.jpg', '.jpeg', '.png')):
+            if _url_ext(url) in _MEDIA_EXTS:
                 clips.append({
                     "source": source["name"],
                     "url": url,
@@ -216,8 +589,22 @@ class AnimeClipScraper:
             if len(clips) >= self.config["download_limit"]:
                 break
         
+        if etag_key and response.headers.get("ETag"):
+            self.store_etag_entry(etag_key, response.headers["ETag"], clips)
+        
         return clips
     
+    @staticmethod
+    def _youtube_url(video_id):
+        return f"https://www.youtube.com/watch?v={video_id}"
+    
+    def _youtube_details(self, video_url, ydl_opts):
+        """Fetch full metadata for a single YouTube video"""
+        import yt_dlp
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(video_url, download=False)
+    
     def scrape_youtube(self, source):
         """Scrape anime video clips from YouTube"""
         clips = []
@@ -229,11 +616,14 @@ class AnimeClipScraper:
         print(f"Searching YouTube for '{search_term}'...")
         
         try:
+            import yt_dlp
+            
             # Use yt-dlp for search
             ydl_opts = {
                 'quiet': True,
                 'no_warnings': True,
-                'extract_flat': True,
+                'socket_timeout': self.request_timeout,
+                'extract_flat': 'in_playlist',
                 'force_generic_extractor': False,
                 'format': 'best[ext=mp4]/best',
             }
@@ -241,41 +631,53 @@ class AnimeClipScraper:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 search_url = f"ytsearch{max_results*2}:{search_term}"  # Search for twice as many to filter
                 search_results = ydl.extract_info(search_url, download=False)
+            
+            if not search_results or 'entries' not in search_results:
+                print("No YouTube search results found")
+                return clips
+            
+            entries = [
+                entry for entry in search_results['entries']
+                if entry and entry.get('_type') != 'playlist' and entry.get('id')
+            ]
+            
+            # Recent yt-dlp flat search results already carry the fields we need;
+            # only fetch detailed info (a few at a time to avoid 429s) when they don't
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = {
+                    entry['id']: executor.submit(self._youtube_details, self._youtube_url(entry['id']), ydl_opts)
+                    for entry in entries
+                    if any(entry.get(key) is None for key in ('duration', 'title'))
+                }
                 
-                if not search_results or 'entries' not in search_results:
-                    print("No YouTube search results found")
-                    return clips
-                
-                # Process each search result
-                for entry in search_results['entries']:
+                # Process each search result in search order
+                for entry in entries:
+                    video_url = self._youtube_url(entry['id'])
                     try:
-                        if not entry or entry.get('_type') == 'playlist':
-                            continue
-                        
-                        video_id = entry.get('id')
-                        if not video_id:
-                            continue
-                        
-                        # Get more detailed info about the video
-                        video_url = f"https://www.youtube.com/watch?v={video_id}"
-                        detailed_info = ydl.extract_info(video_url, download=False)
+                        future = futures.get(entry['id'])
+                        info = future.result() if future else entry
                         
                         # Check duration
-                        duration = detailed_info.get('duration')
+                        duration = info.get('duration')
                         if duration and (duration < min_duration or duration > max_duration):
                             continue
                         
+                        # Flat entries list thumbnails instead of a single thumbnail
+                        thumbnail = info.get('thumbnail')
+                        if not thumbnail and info.get('thumbnails'):
+                            thumbnail = info['thumbnails'][-1].get('url')
+                        
                         # Add to clips list
                         clips.append({
                             "source": "youtube",
                             "url": video_url,
-                            "title": detailed_info.get('title', ''),
+                            "title": info.get('title', ''),
                             "duration": duration,
-                            "thumbnail": detailed_info.get('thumbnail', ''),
-                            "tags": detailed_info.get('tags', [])
+                            "thumbnail": thumbnail or '',
+                            "tags": info.get('tags') or []
                         })
                         
-                        print(f"Found YouTube clip: {detailed_info.get('title', 'Untitled')} ({duration}s)")
+                        print(f"Found YouTube clip: {info.get('title', 'Untitled')} ({duration}s)")
                         
                         if len(clips) >= max_results:
                             break
@@ -283,6 +685,10 @@ class AnimeClipScraper:
                     except Exception as e:
                         print(f"Error processing YouTube result: {str(e)}")
                         continue
+                
+                # Don't fetch metadata for results we no longer need
+                for future in futures.values():
+                    future.cancel()
         
         except Exception as e:
             print(f"Error scraping YouTube: {str(e)}")
@@ -292,6 +698,7 @@ class AnimeClipScraper:
     def scrape_tenor(self, source):
         """Scrape anime GIFs from Tenor"""
         clips = []
+        limit = self.config["download_limit"]
         
         search_term = source.get("search_term", "anime")
         base_url = source["base_url"]
@@ -303,61 +710,55 @@ class AnimeClipScraper:
         print(f"Scraping {source['name']} for '{search_term}' GIFs...")
         
         try:
-            response = requests.get(base_url, headers=self.headers)
+            response = self.fetch(base_url)
             
             if response.status_code != 200:
                 print(f"Failed to fetch {base_url}, status code: {response.status_code}")
                 return clips
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            gif_elements = soup.select(source["clip_selector"])
+            tree = _parse_html(response)
+            gif_elements = _select_all(tree, source["clip_selector"])
             
             print(f"Found {len(gif_elements)} GIF elements")
             
             for element in gif_elements:
                 try:
                     # Extract the image source
-                    img_element = element.select_one(source["link_selector"])
-                    if not img_element:
+                    img_element = _select_first(element, source["link_selector"])
+                    if img_element is None:
                         continue
                     
                     # Get image source, which might be in src or data-src attribute
-                    src = img_element.get('src') or img_element.get('data-src')
+                    src = _get_attr(img_element, 'src') or _get_attr(img_element, 'data-src')
                     if not src:
                         continue
                     
-                    # Tenor typically serves WebP images, but we want the GIF
-                    # Convert the URL to get the GIF version
-                    if "tenor.com" in src and not src.endswith('.gif'):
-                        # Example: https://media.tenor.com/images/xyz/tenor.gif
-                        gif_id = None
-                        
-                        # Extract GIF ID from various formats
-                        if "/images/" in src:
-                            parts = src.split("/")
-                            for i, part in enumerate(parts):
-                                if part == "images" and i+1 < len(parts):
-                                    gif_id = parts[i+1]
-                                    break
+                    # Only GIF URLs are kept; bail out early on anything we can't turn into one
+                    if _url_ext(src) != 'gif':
+                        if "tenor.com" not in src:
+                            continue
                         
-                        if gif_id:
-                            src = f"https://media.tenor.com/images/{gif_id}/tenor.gif"
+                        # Tenor typically serves WebP images, but we want the GIF
+                        # Convert the URL to get the GIF version
+                        # Example: https://media.tenor.com/images/xyz/tenor.gif
+                        match = self._TENOR_ID_RE.search(src)
+                        if not match:
+                            continue
+                        src = f"https://media.tenor.com/images/{match.group(1)}/tenor.gif"
                     
-                    # Only add GIF URLs
-                    if src.lower().endswith('.gif'):
-                        # Get title if available
-                        alt_text = img_element.get('alt', '')
-                        title = alt_text if alt_text and alt_text != "tenor" else f"tenor_gif_{len(clips)}"
-                        
-                        clips.append({
-                            "source": source["name"],
-                            "url": src,
-                            "title": title,
-                            "tags": ["anime", search_term]
-                        })
-                        
-                        if len(clips) >= self.config["download_limit"]:
-                            break
+                    # Get title if available
+                    alt_text = _get_attr(img_element, 'alt') or ''
+                    title = alt_text if alt_text and alt_text != "tenor" else f"tenor_gif_{len(clips)}"
+                    
+                    clips.append({
+                        "source": source["name"],
+                        "url": src,
+                        "title": title,
+                        "tags": ["anime", search_term]
+                    })
+                    
+                    if len(clips) >= limit:
+                        break
                 
                 except Exception as e:
                     print(f"Error processing Tenor GIF: {str(e)}")
@@ -367,115 +768,215 @@ class AnimeClipScraper:
         except Exception as e:
             print(f"Error scraping Tenor: {str(e)}")
         
-        return clips[:self.config["download_limit"]]
+        return clips[:limit]
     
-    def download_clips(self, clips, category=None):
-        """Download clips to the output directory"""
-        download_dir = self.output_dir
-        if category:
-            download_dir = self.output_dir / category
-            download_dir.mkdir(exist_ok=True)
+    def _host_slot(self, url):
+        """Return the semaphore bounding concurrent downloads from url's host"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(4)
+            return self._host_slots[host]
+    
+    def _download_direct(self, url, output_path):
+        """Stream a direct media URL to output_path, returning False on a non-200 response"""
+        # Follow redirects to get the actual content
+        with self.download_session.get(url, stream=True, allow_redirects=True, timeout=self.request_timeout) as response:
+            if response.status_code != 200:
+                print(f"Failed to download {url}: HTTP status {response.status_code}")
+                return False
+            
+            # Copy the body in 1 MiB blocks in C rather than 8 KiB Python iterations
+            response.raw.decode_content = True
+            try:
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+            except Exception:
+                # Don't leave a truncated file behind to be mistaken for a finished download
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+        return True
+    
+    def _ytdlp_download(self, url, output_path):
+        """Download url to output_path with this thread's YoutubeDL instance"""
+        ydl = getattr(self._ydl_local, "ydl", None)
+        if ydl is None:
+            import yt_dlp
+            
+            ydl = yt_dlp.YoutubeDL({
+                'outtmpl': '%(id)s.%(ext)s',  # Replaced per download
+                'quiet': True,
+                'no_warnings': True,
+                'socket_timeout': self.request_timeout,
+                'buffersize': 65536,  # Start at 64 KiB reads/writes instead of 1 KiB
+                'format': 'best[ext=mp4]/best',
+                'merge_output_format': 'mp4',
+            })
+            self._ydl_local.ydl = ydl
+            with self._downloaders_lock:
+                self._downloaders.append(ydl)
         
-        # Sort clips to prioritize videos over GIFs if the config specifies
-        if self.config.get("prefer_video", True):
-            # Move video clips to the front
-            clips.sort(key=lambda x: 0 if x["url"].lower().endswith(('.mp4', '.webm')) else 
-                                  (1 if "youtube.com" in x["url"].lower() else 2))
+        ydl.params['outtmpl']['default'] = output_path
+        ydl.download([url])
+    
+    def close(self):
+        """Close the HTTP sessions (and the httpx client's HTTP/2 connections)"""
+        if self.http_client is not None:
+            self.http_client.close()
+            self.http_client = None
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _close_downloaders(self):
+        """Close the YoutubeDL instances created by download threads"""
+        with self._downloaders_lock:
+            downloaders, self._downloaders = self._downloaders, []
+        for ydl in downloaders:
+            ydl.close()
+    
+    def _clip_filename(self, clip):
+        """Build a clean file name (with an extension) for a clip's URL"""
+        url = clip["url"]
+        path = urlparse(url).path
+        filename = os.path.basename(path)
         
-        # Track downloaded videos for super resolution
-        downloaded_videos = []
+        # For YouTube URLs, use the video ID and title for filename
+        if "youtube.com" in url or "youtu.be" in url:
+            video_id = None
+            if "youtube.com/watch" in url and "v=" in url:
+                video_id = url.split("v=")[1].split("&")[0]
+            elif "youtu.be/" in url:
+                video_id = url.split("youtu.be/")[1].split("?")[0]
+            
+            if video_id and clip.get("title"):
+                # Clean up title for filename
+                clean_title = self._TITLE_RE.sub('_', clip.get("title"))
+                clean_title = clean_title[:50]  # Limit length
+                filename = f"{clean_title}_{video_id}.mp4"
+        elif self._GENERIC_STEM_RE.match(os.path.splitext(filename)[0]):
+            # e.g. v.redd.it/<post id>/DASH_720.mp4 -> <post id>_DASH_720.mp4
+            parent = os.path.basename(os.path.dirname(path))
+            if parent:
+                filename = f"{parent}_{filename}"
         
-        for i, clip in enumerate(clips):
-            try:
-                url = clip["url"]
-                
-                # For YouTube URLs, use the video ID and title for filename
-                if "youtube.com" in url or "youtu.be" in url:
-                    video_id = None
-                    if "youtube.com/watch" in url and "v=" in url:
-                        video_id = url.split("v=")[1].split("&")[0]
-                    elif "youtu.be/" in url:
-                        video_id = url.split("youtu.be/")[1].split("?")[0]
-                    
-                    if video_id and clip.get("title"):
-                        # Clean up title for filename
-                        clean_title = re.sub(r'[^\w\-_. ]', '_', clip.get("title"))
-                        clean_title = clean_title[:50]  # Limit length
-                        filename = f"{clean_title}_{video_id}.mp4"
-                    else:
-                        filename = os.path.basename(urlparse(url).path)
-                else:
-                    filename = os.path.basename(urlparse(url).path)
-                
-                # Clean up filename and ensure it has an extension
-                filename = re.sub(r'[^\w\-_.]', '_', filename)
-                if not os.path.splitext(filename)[1]:
-                    filename += ".mp4"
-                
-                output_path = download_dir / filename
-                
-                # Skip if the file already exists
-                if output_path.exists():
-                    print(f"File already exists: {output_path}")
-                    if output_path.suffix.lower() in ['.mp4', '.webm', '.mkv']:
-                        downloaded_videos.append(str(output_path))
-                    continue
-                
-                print(f"Downloading {i+1}/{len(clips)}: {url}")
+        # Clean up filename and ensure it has an extension
+        filename = self._FN_RE.sub('_', filename)
+        if not os.path.splitext(filename)[1]:
+            filename += ".mp4"
+        return filename
+    
+    @staticmethod
+    def _reserve_path(download_dir, filename, reserved):
+        """Claim a unique output path for filename, numbering it if another clip has it"""
+        stem, ext = os.path.splitext(filename)
+        n = 1
+        while filename in reserved:
+            filename = f"{stem}_{n}{ext}"
+            n += 1
+        reserved.add(filename)
+        return os.path.join(download_dir, filename)
+    
+    def _download_one(self, clip, i, total, output_path, image_cutoff=None):
+        """Download a single clip to output_path, returning the path if it is a video file
+        
+        output_path must be unique to this clip (see _reserve_path), since clips are
+        downloaded in parallel. Images at index image_cutoff or later are skipped
+        (used when videos are preferred).
+        """
+        try:
+            url = clip["url"]
+            is_video = os.path.splitext(output_path)[1][1:].lower() in _VIDEO_EXTS
+            
+            # Skip if the file already exists
+            if os.path.exists(output_path):
+                print(f"File already exists: {output_path}")
+                if is_video:
+                    return output_path
+                return None
+            
+            print(f"Downloading {i+1}/{total}: {url}")
+            
+            # Direct media links (GIFs, MP4s, ...) are streamed with requests;
+            # only pages that need extraction (YouTube, etc.) go through yt-dlp
+            url_ext = _url_ext(url)
+            is_image = url_ext in _IMAGE_EXTS
+            
+            # If we prefer videos and have reached at least half our limit, skip images
+            if is_image and image_cutoff is not None and i >= image_cutoff:
+                print(f"Skipping image file (preferring videos): {url}")
+                return None
+            
+            with self._host_slot(url):
+                self.throttle.wait(url)
                 
-                # For direct image files (GIF, etc.), use requests instead of yt-dlp
-                if url.lower().endswith(('.gif', '.jpg', '.jpeg', '.png')):
-                    # If we prefer videos and have reached at least half our limit, skip images
-                    if self.config.get("prefer_video", True) and i >= (self.config["download_limit"] // 2):
-                        print(f"Skipping image file (preferring videos): {url}")
-                        continue
-                    
+                if url_ext in _MEDIA_EXTS:
                     try:
-                        # Follow redirects to get the actual content
-                        response = requests.get(url, headers=self.headers, stream=True, allow_redirects=True)
-                        if response.status_code == 200:
-                            with open(output_path, 'wb') as f:
-                                for chunk in response.iter_content(chunk_size=8192):
-                                    f.write(chunk)
-                            print(f"Downloaded to {output_path}")
-                        else:
-                            print(f"Failed to download {url}: HTTP status {response.status_code}")
+                        if not self._download_direct(url, output_path):
+                            return None
+                        print(f"Downloaded to {output_path}")
                     except Exception as e:
                         print(f"Failed to download {url} using direct method: {str(e)}")
                         # Try fallback with yt-dlp
                         try:
-                            ydl_opts = {
-                                'outtmpl': str(output_path),
-                                'quiet': True,
-                                'no_warnings': True,
-                                'format': 'best[ext=mp4]/best',
-                            }
-                            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                                ydl.download([url])
+                            self._ytdlp_download(url, output_path)
                             print(f"Downloaded to {output_path} using yt-dlp fallback")
                         except Exception as e2:
                             print(f"Fallback also failed: {str(e2)}")
+                            return None
                 else:
                     # Use yt-dlp for video content
-                    ydl_opts = {
-                        'outtmpl': str(output_path),
-                        'quiet': True,
-                        'no_warnings': True,
-                        'format': 'best[ext=mp4]/best',
-                        'merge_output_format': 'mp4',
-                    }
-                    
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([url])
+                    self._ytdlp_download(url, output_path)
                     
                     print(f"Downloaded to {output_path}")
-                    if output_path.suffix.lower() in ['.mp4', '.webm', '.mkv']:
-                        downloaded_videos.append(str(output_path))
-                
-                self.random_delay()
-                
-            except Exception as e:
-                print(f"Failed to download {url}: {str(e)}")
+            
+            if is_video:
+                return output_path
+        
+        except Exception as e:
+            print(f"Failed to download {url}: {str(e)}")
+        
+        return None
+    
+    def download_clips(self, clips, category=None):
+        """Download clips to the output directory"""
+        download_dir = self.output_dir
+        if category:
+            download_dir = self.output_dir / category
+            download_dir.mkdir(exist_ok=True)
+        
+        prefer_video = self.config.get("prefer_video", True)
+        # If we prefer videos and have reached at least half our limit, images are skipped
+        image_cutoff = self.config["download_limit"] // 2 if prefer_video else None
+        
+        # Sort clips to prioritize videos over GIFs if the config specifies
+        if prefer_video:
+            # Move video clips to the front
+            clips.sort(key=lambda x: 0 if _url_ext(x["url"]) in _VIDEO_EXTS else
+                                  (1 if "youtube.com" in x["url"].lower() else 2))
+        
+        # Plain string paths avoid re-parsing a Path for every clip
+        download_dir_s = str(download_dir)
+        
+        # Name every clip up front, so parallel downloads never share an output file
+        reserved = set()
+        output_paths = [self._reserve_path(download_dir_s, self._clip_filename(clip), reserved) for clip in clips]
+        
+        # Download in parallel; per-host slots keep each server's load bounded
+        max_workers = max(1, int(self.config.get("max_download_concurrency", 8)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._download_one, clip, i, len(clips), output_path, image_cutoff)
+                for i, (clip, output_path) in enumerate(zip(clips, output_paths))
+            ]
+            # Track downloaded videos for super resolution
+            downloaded_videos = [path for path in (future.result() for future in futures) if path]
+        self._close_downloaders()
         
         # Apply super resolution to downloaded videos if enabled
         if self.super_resolution and self.config.get("enhance_videos", False) and downloaded_videos:
@@ -483,7 +984,8 @@ class AnimeClipScraper:
             for video_path in downloaded_videos:
                 try:
                     # Process the video with super resolution
-                    output_path = Path(video_path).parent / (Path(video_path).stem + f"_enhanced{Path(video_path).suffix}")
+                    p = Path(video_path)
+                    output_path = p.with_name(p.stem + "_enhanced" + p.suffix)
                     # Only process if enhanced version doesn't exist
                     if not output_path.exists():
                         print(f"Enhancing: {video_path}")
@@ -496,29 +998,44 @@ class AnimeClipScraper:
     def scrape(self, category=None):
         """Main method to scrape clips from all sources"""
         all_clips = []
+        # The same clip is often cross-posted (e.g. a Sakugabooru mp4 linked on Reddit)
+        seen_urls = set()
         
+        jobs = []
         for source in self.config["sources"]:
-            try:
-                if source["name"] == "sakugabooru":
-                    clips = self.scrape_sakugabooru(source)
-                elif source["name"] == "animeclips_reddit":
-                    clips = self.scrape_reddit(source)
-                elif source["name"] == "tenor_anime":
-                    # Skip Tenor if prefer_video is True
-                    if self.config.get("prefer_video", True):
-                        print(f"Skipping {source['name']} since video content is preferred")
-                        continue
-                    clips = self.scrape_tenor(source)
-                elif source["name"] == "youtube_anime":
-                    clips = self.scrape_youtube(source)
-                else:
-                    print(f"Unknown source: {source['name']}")
-                    continue
-                
-                all_clips.extend(clips)
-                print(f"Found {len(clips)} clips from {source['name']}")
-            except Exception as e:
-                print(f"Error scraping from {source['name']}: {str(e)}")
+            scraper = self._scrapers.get(source["name"])
+            if not scraper:
+                print(f"Unknown source: {source['name']}")
+                continue
+            
+            # Skip Tenor if prefer_video is True
+            if source["name"] == "tenor_anime" and self.config.get("prefer_video", True):
+                print(f"Skipping {source['name']} since video content is preferred")
+                continue
+            
+            jobs.append((source, scraper))
+        
+        # Scrape all sources concurrently, but merge results in config order
+        with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), 8))) as executor:
+            futures = [executor.submit(scraper, source) for source, scraper in jobs]
+            
+            for (source, _), future in zip(jobs, futures):
+                try:
+                    clips = future.result()
+                    duplicates = 0
+                    for clip in clips:
+                        if clip["url"] in seen_urls:
+                            duplicates += 1
+                            continue
+                        seen_urls.add(clip["url"])
+                        all_clips.append(clip)
+                    
+                    if duplicates:
+                        print(f"Found {len(clips)} clips from {source['name']} ({duplicates} already found elsewhere)")
+                    else:
+                        print(f"Found {len(clips)} clips from {source['name']}")
+                except Exception as e:
+                    print(f"Error scraping from {source['name']}: {str(e)}")
         
         # Limit total clips
         all_clips = all_clips[:self.config["download_limit"]]
@@ -541,6 +1058,7 @@ def main():
     parser.add_argument("--sr-denoise", type=float, default=0.5, help="Denoise strength for super resolution (0.0 to 1.0)")
     parser.add_argument("--sr-model", choices=["anime", "general"], default="anime", help="Super resolution model to use")
     parser.add_argument("--enhance-only", help="Enhance existing videos in directory without downloading new ones")
+    parser.add_argument("--force-refresh", action="store_true", help="Ignore cached listing pages and re-fetch every source")
     
     args = parser.parse_args()
     
@@ -552,6 +1070,9 @@ def main():
     if args.prefer_video:
         scraper.config["prefer_video"] = True
     
+    if args.force_refresh:
+        scraper.force_refresh = True
+    
     # Update super resolution settings if provided
     if args.enhance:
         scraper.config["enhance_videos"] = True
@@ -566,7 +1087,8 @@ def main():
             scraper.config["sr_model"] = "realesr-animevideov3" if args.sr_model == "anime" else "realesrgan-x4plus"
             
         # Reinitialize super resolution with new settings
-        if HAS_REALESRGAN:
+        SuperResolution = _load_super_resolution()
+        if SuperResolution:
             try:
                 scraper.super_resolution = SuperResolution(
                     model_name=scraper.config.get("sr_model", "realesr-animevideov3"),
@@ -582,7 +1104,7 @@ def main():
     
     # If enhance-only mode is active, just enhance existing videos
     if args.enhance_only:
-        if not HAS_REALESRGAN or not scraper.super_resolution:
+        if not scraper.super_resolution:
             print("Super resolution is not available. Please install the required dependencies.")
             sys.exit(1)
             
@@ -620,7 +1142,8 @@ def main():
         
         youtube_source["search_term"] = args.search
     
-    scraper.scrape(category=args.category)
+    with scraper:
+        scraper.scrape(category=args.category)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
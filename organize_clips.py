@@ -1,27 +1,46 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
 import shutil
 import argparse
 from pathlib import Path
 import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+# Use orjson for reading the config if available
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
 
 def load_config(config_file):
     """Load the configuration file"""
     if os.path.exists(config_file):
-        with open(config_file, 'r') as f:
-            return json.load(f)
+        with open(config_file, 'rb') as f:
+            return _json_loads(f.read())
     else:
         print(f"Config file {config_file} not found.")
         return None
 
+# File extensions (lowercase) treated as clips
+_CLIP_EXTS = frozenset({'.mp4', '.webm', '.gif'})
+
+def iter_clips(directory):
+    """Yield all video clips in the specified directory, in walk order"""
+    # One walk of the tree, filtering by extension, instead of a recursive glob per extension
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in _CLIP_EXTS:
+                yield Path(root) / name
+
 def list_clips(directory):
     """List all video clips in the specified directory"""
-    clips = []
-    for ext in ['.mp4', '.webm', '.gif']:
-        clips.extend(list(Path(directory).glob(f'**/*{ext}')))
-    
-    return sorted(clips)
+    return sorted(iter_clips(directory))
 
 def list_categories(config):
     """List available categories from config"""
@@ -34,29 +53,83 @@ def create_category_dirs(base_dir, categories):
         category_dir.mkdir(exist_ok=True)
         print(f"Created directory: {category_dir}")
 
-def move_clip(clip_path, dest_dir):
-    """Move a clip to a specified destination directory"""
-    dest_path = Path(dest_dir) / clip_path.name
-    
+def _unique_dest_name(name, existing_names):
+    """Return name, or name with a numeric suffix if it is already in existing_names"""
     # If the file already exists in the destination, add a suffix
-    if dest_path.exists():
-        base_name = dest_path.stem
-        extension = dest_path.suffix
+    if name in existing_names:
+        base_name, extension = os.path.splitext(name)
         counter = 1
         
-        while dest_path.exists():
-            new_name = f"{base_name}_{counter}{extension}"
-            dest_path = dest_path.parent / new_name
+        while name in existing_names:
+            name = f"{base_name}_{counter}{extension}"
             counter += 1
     
-    # Move the file
+    return name
+
+def _move(clip_path, dest_path, log=None):
+    """Move a clip to an already resolved destination path
+    
+    The "Moved" line is appended to log if given, otherwise printed.
+    """
     shutil.move(str(clip_path), str(dest_path))
-    print(f"Moved: {clip_path.name} -> {dest_path}")
+    message = f"Moved: {clip_path.name} -> {dest_path}\n"
+    if log is None:
+        sys.stdout.write(message)
+    else:
+        log.append(message)
     
     return dest_path
 
+def move_clip(clip_path, dest_dir, existing_names=None):
+    """Move a clip to a specified destination directory
+    
+    existing_names is the set of file names in dest_dir; pass the same set across
+    calls to avoid re-listing the directory. It is updated with the new name.
+    """
+    if existing_names is None:
+        existing_names = set(os.listdir(dest_dir))
+    
+    name = _unique_dest_name(clip_path.name, existing_names)
+    existing_names.add(name)
+    return _move(clip_path, Path(dest_dir) / name)
+
+def move_clips(moves, max_workers=8):
+    """Move clips to their destination directories in parallel
+    
+    Args:
+        moves: Iterable of (clip_path, dest_dir) pairs
+        max_workers (int): Number of moves to run at once
+    
+    Returns:
+        List of destination paths, in the order of moves
+    """
+    # Resolve every destination name up front so concurrent moves can't collide,
+    # listing each destination directory once instead of probing names with stat()
+    existing_names = {}
+    pairs = []
+    for clip_path, dest_dir in moves:
+        if dest_dir not in existing_names:
+            existing_names[dest_dir] = set(os.listdir(dest_dir))
+        names = existing_names[dest_dir]
+        
+        name = _unique_dest_name(clip_path.name, names)
+        names.add(name)
+        pairs.append((clip_path, Path(dest_dir) / name))
+    
+    # Moves are syscall/IO bound (and copy across filesystems), so threads overlap them
+    # Report all moves with one write instead of a locked, flushed print per clip
+    log = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda pair: _move(*pair, log), pairs))
+    finally:
+        sys.stdout.writelines(log)
+
 def interactive_categorize(clips, categories, base_dir):
     """Interactive mode to categorize clips"""
+    # File names in each category directory, listed on first use
+    existing_names = {}
+    
     for i, clip in enumerate(clips):
         print(f"\nClip {i+1}/{len(clips)}: {clip.name}")
         
@@ -82,7 +155,9 @@ def interactive_categorize(clips, categories, base_dir):
             if 1 <= choice_num <= len(categories):
                 selected_category = categories[choice_num-1]
                 dest_dir = Path(base_dir) / selected_category
-                move_clip(clip, dest_dir)
+                if selected_category not in existing_names:
+                    existing_names[selected_category] = set(os.listdir(dest_dir))
+                move_clip(clip, dest_dir, existing_names[selected_category])
             else:
                 print("Invalid category number.")
         except ValueError:
@@ -92,42 +167,50 @@ def batch_categorize(clips, category, base_dir):
     """Move all clips to a specific category"""
     dest_dir = Path(base_dir) / category
     
-    for clip in clips:
-        move_clip(clip, dest_dir)
+    moved = move_clips((clip, dest_dir) for clip in clips)
     
-    print(f"\nMoved {len(clips)} clips to '{category}' category.")
+    print(f"\nMoved {len(moved)} clips to '{category}' category.")
+
+# Filename keywords for the built-in categories, checked in this order
+_CATEGORY_KEYWORDS = {
+    "action": ["action", "fight", "battle", "explosion", "combat"],
+    "fight": ["fight", "battle", "duel", "combat", "vs", "versus"],
+    "emotional": ["sad", "cry", "tear", "emotional", "drama", "love"],
+    "comedy": ["funny", "comedy", "laugh", "humor", "joke", "gag"]
+}
+
+def _keyword_pattern(keywords):
+    """Compile keywords into one regex that matches any of them as a substring"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+# Compiled once so each filename is scanned in C once per category
+_CATEGORY_PATTERNS = {category: _keyword_pattern(keywords) for category, keywords in _CATEGORY_KEYWORDS.items()}
 
 def auto_categorize_by_name(clips, categories, base_dir):
     """Auto-categorize clips based on filename keywords"""
-    # Create a dictionary of category keywords
-    category_keywords = {
-        "action": ["action", "fight", "battle", "explosion", "combat"],
-        "fight": ["fight", "battle", "duel", "combat", "vs", "versus"],
-        "emotional": ["sad", "cry", "tear", "emotional", "drama", "love"],
-        "comedy": ["funny", "comedy", "laugh", "humor", "joke", "gag"]
-    }
-    
-    # Update with user-defined categories
+    # Add user-defined categories, matched by their own name
+    category_patterns = dict(_CATEGORY_PATTERNS)
     for category in categories:
-        if category not in category_keywords:
-            category_keywords[category] = [category.lower()]
+        if category not in category_patterns:
+            category_patterns[category] = _keyword_pattern([category.lower()])
     
-    categorized = 0
+    moves = []
     
     for clip in clips:
         filename = clip.stem.lower()
         
         # Try to find matching category
         matched_category = None
-        for category, keywords in category_keywords.items():
-            if any(keyword in filename for keyword in keywords):
+        for category, pattern in category_patterns.items():
+            if pattern.search(filename):
                 matched_category = category
                 break
         
         if matched_category and matched_category in categories:
-            dest_dir = Path(base_dir) / matched_category
-            move_clip(clip, dest_dir)
-            categorized += 1
+            moves.append((clip, Path(base_dir) / matched_category))
+    
+    move_clips(moves)
+    categorized = len(moves)
     
     print(f"\nAuto-categorized {categorized} clips based on filename.")
     return categorized
@@ -191,13 +274,18 @@ def main():
     # Ensure category directories exist
     create_category_dirs(base_dir, categories)
     
-    # Get all clips
-    clips = list_clips(base_dir)
+    # Get all clips; batch and auto moves don't depend on order, so they stream
+    # clips from the walk instead of building and sorting the full list
+    if args.action in ("batch", "auto"):
+        clips = iter_clips(base_dir)
+        first = next(clips, None)
+        clips = [] if first is None else chain([first], clips)
+    else:
+        clips = list_clips(base_dir)
     
     if args.action == "list" or not args.action:
         print(f"Found {len(clips)} clips:")
-        for i, clip in enumerate(clips, 1):
-            print(f"{i}. {clip}")
+        sys.stdout.writelines(f"{i}. {clip}\n" for i, clip in enumerate(clips, 1))
     
     elif args.action == "interactive":
         if not clips:
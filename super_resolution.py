@@ -6,11 +6,19 @@ import torch
 import numpy as np
 from pathlib import Path
 import argparse
+import importlib.util
 import time
 from tqdm import tqdm
 import subprocess
-import tempfile
 import shutil
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+
+import torch.nn.functional as F
 
 # Check if RealESRGAN is available
 try:
@@ -22,8 +30,74 @@ except ImportError:
     print("Warning: RealESRGAN not found. Super resolution features will be disabled.")
     print("Install with: pip install realesrgan")
 
+# PyAV is optional; it reads video metadata without opening a decoder
+try:
+    import av
+    HAS_AV = True
+except ImportError:
+    HAS_AV = False
+
+# TensorRT engines are optional (--engine trt). torch_tensorrt is slow and noisy
+# to import, so only check it's installed here; _trt_module imports it on first use
+HAS_TORCH_TENSORRT = importlib.util.find_spec('torch_tensorrt') is not None
+
+@lru_cache(maxsize=None)
+def ffmpeg_has_encoder(name):
+    """Check whether the installed ffmpeg was built with the named encoder"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+def probe_video(path):
+    """Return (width, height, frame_count, fps) of a video's first video stream"""
+    if HAS_AV:
+        try:
+            with av.open(str(path)) as container:
+                stream = container.streams.video[0]
+                fps = float(stream.average_rate or stream.guessed_rate or 0)
+                frames = stream.frames
+                if not frames:
+                    # Some containers (e.g. webm) don't store a frame count, estimate it
+                    if stream.duration and stream.time_base:
+                        frames = int(float(stream.duration * stream.time_base) * fps)
+                    elif container.duration:
+                        frames = int(container.duration / av.time_base * fps)
+                return stream.codec_context.width, stream.codec_context.height, frames, fps
+        except Exception:
+            pass  # Let OpenCV have a go
+    
+    cap = cv2.VideoCapture(str(path))
+    try:
+        return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS))
+    finally:
+        cap.release()
+
+def scan_videos(directory, exts, recursive=False, exclude=None):
+    """Yield files under directory whose lower-cased suffix is in exts
+    
+    Hidden directories, and the exclude directory (e.g. the output folder when it
+    lives inside the input folder), are not descended into.
+    """
+    exclude = os.path.realpath(exclude) if exclude is not None else None
+    pending = [os.fspath(directory)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and not entry.name.startswith('.') and os.path.realpath(entry.path) != exclude:
+                        pending.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in exts:
+                    yield Path(entry.path)
+
 class SuperResolution:
-    def __init__(self, model_name='realesr-animevideov3', device='auto', scale=2, denoise_strength=0.5):
+    def __init__(self, model_name='realesr-animevideov3', device='auto', scale=2, denoise_strength=0.5,
+                 encoder='auto', channels_last=False, compile_model=False, quantize=None,
+                 tile_size=0, tile_pad=10, cuda_graphs=False, dtype='auto',
+                 engine='torch'):
         """Initialize the super resolution enhancer
         
         Args:
@@ -32,8 +106,29 @@ class SuperResolution:
             device (str): Device to use. 'auto', 'cuda', or 'cpu'
             scale (int): Upscale factor (2, 3, 4)
             denoise_strength (float): Denoise strength from 0 to 1
+            encoder (str): Video encoder. 'auto' (NVENC when running on CUDA and
+                           ffmpeg supports it), 'nvenc', or 'cpu'
+            channels_last (bool): Run the model in NHWC memory format; often faster
+                                  on Tensor Core GPUs, but benchmark it for your setup
+            compile_model (bool): Compile the model with torch.compile (CUDA only);
+                                  the first batch is slow while kernels are generated
+            quantize (str, optional): 'int8' to statically quantize the model for CPU
+                                      inference, calibrated on the first batch of frames
+            tile_size (int): Split frames larger than this into tiles (0 disables tiling);
+                             use it when large frames run out of GPU memory
+            tile_pad (int): Overlap around each tile, blended away when stitching
+            cuda_graphs (bool): Capture the forward pass in a CUDA graph and replay it
+                                for every batch of the same shape (CUDA only)
+            dtype (str): Model precision. 'auto' (fp16 on CUDA, fp32 on CPU), 'fp32',
+                         'fp16', or 'bf16' (fp32's range at fp16's cost, Ampere or newer)
+            engine (str): Inference engine. 'torch', or 'trt' to build (and cache on disk)
+                          a TensorRT engine per frame size with torch-tensorrt (CUDA only)
         """
         self.model_name = model_name
+        self.encoder = encoder
+        self.channels_last = channels_last
+        self.tile_size = max(tile_size, 0)
+        self.tile_pad = max(tile_pad, 0)
         
         if not HAS_REALESRGAN:
             raise ImportError("RealESRGAN is required for super resolution. Install with pip install realesrgan")
@@ -44,6 +139,37 @@ class SuperResolution:
         else:
             self.device = device
         
+        if self.device == 'cuda':
+            # Let fp32 matmuls/convs use TF32 Tensor Cores, and let cuDNN benchmark
+            # the fastest conv algorithm for the (fixed) frame size
+            torch.set_float32_matmul_precision('high')
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            torch.backends.cudnn.benchmark = True
+        
+        # Resolve the model precision for this device
+        if dtype == 'auto':
+            dtype = 'fp16' if self.device == 'cuda' else 'fp32'
+        if dtype == 'fp16' and self.device != 'cuda':
+            print("fp16 is only supported on CUDA, running the model in fp32")
+            dtype = 'fp32'
+        if dtype == 'bf16' and self.device == 'cuda' and not torch.cuda.is_bf16_supported():
+            print("This GPU doesn't support bf16, running the model in fp16")
+            dtype = 'fp16'
+        self.dtype = dtype
+        
+        # Per-shape buffers (pinned staging tensors, CUDA graph) keyed by
+        # (height, width, batch), kept across videos so same-sized clips skip the warmup
+        self._shape_cache = OrderedDict()
+        
+        # Separate CUDA streams for uploads, the model and downloads, so one batch's
+        # upload and forward pass can overlap the previous batch's download
+        self._upload_stream = self._compute_stream = self._download_stream = None
+        if self.device == 'cuda':
+            self._upload_stream = torch.cuda.Stream()
+            self._compute_stream = torch.cuda.Stream()
+            self._download_stream = torch.cuda.Stream()
+        
         # Ensure scale is valid
         self.scale = max(min(scale, 4), 2)  # Between 2 and 4
         
@@ -53,6 +179,46 @@ class SuperResolution:
         # Initialize model
         self.initialize_model()
         
+        # TensorRT engines are built per input shape on first use, see _trt_module
+        self.engine = 'torch'
+        if engine == 'trt':
+            if self.device != 'cuda':
+                print("TensorRT requires a CUDA device, running the model in PyTorch")
+            elif not HAS_TORCH_TENSORRT:
+                print("torch-tensorrt not found, running the model in PyTorch. Install with: pip install torch-tensorrt")
+            else:
+                self.engine = 'trt'
+                if compile_model or cuda_graphs:
+                    print("TensorRT already optimises the whole graph, ignoring --compile/--cuda-graphs")
+                    compile_model = cuda_graphs = False
+        
+        # Keep the eager model so we can fall back if compilation fails on first use
+        self._eager_model = None
+        if compile_model:
+            if self.device == 'cuda' and hasattr(torch, 'compile'):
+                self._eager_model = self.upsampler.model
+                self.upsampler.model = torch.compile(self.upsampler.model, mode='reduce-overhead')
+            else:
+                print("torch.compile requires PyTorch 2 and a CUDA device, running the model eagerly")
+        
+        # INT8 kernels only exist for the CPU backends (fbgemm/x86, qnnpack)
+        self._int8_pending = False
+        if quantize == 'int8':
+            if self.device == 'cpu':
+                self._int8_pending = True
+            else:
+                print("INT8 quantization is only supported on CPU, running the model in floating point")
+        
+        # torch.compile's reduce-overhead mode already replays CUDA graphs itself
+        self.cuda_graphs = False
+        if cuda_graphs:
+            if self.device != 'cuda':
+                print("CUDA graphs require a CUDA device, running the model eagerly")
+            elif self._eager_model is not None:
+                print("torch.compile already uses CUDA graphs, ignoring --cuda-graphs")
+            else:
+                self.cuda_graphs = True
+        
         print(f"Super resolution initialized with {self.model_name} on {self.device}")
         print(f"Scale: {self.scale}x, Denoise Strength: {self.denoise_strength}")
     
@@ -86,42 +252,480 @@ class SuperResolution:
             model_path=model_path,
             model=model,
             dni_weight=self.denoise_strength,
-            half=self.device == 'cuda',  # Use half precision on CUDA for memory efficiency
+            tile=self.tile_size,
+            tile_pad=self.tile_pad,
+            half=self.dtype == 'fp16',  # Use half precision on CUDA for memory efficiency
             device=self.device
         )
+        
+        # Inference only: no dropout/batch-norm updates. Autograd is switched off per
+        # call with inference_mode, not globally, so importers can still train
+        self.upsampler.model.eval()
+        if self.dtype == 'bf16':
+            self.upsampler.model = self.upsampler.model.to(torch.bfloat16)
+        
+        if self.channels_last:
+            self.upsampler.model = self.upsampler.model.to(memory_format=torch.channels_last)
+    
+    def _autocast(self):
+        """Autocast context for the model's reduced precision (a no-op in fp32)
+        
+        Keeps any op that would otherwise run in fp32 (and the casts around it) in
+        fp16/bf16. The cast cache is off so the context is safe around CUDA graph capture.
+        """
+        precision = {'fp16': torch.float16, 'bf16': torch.bfloat16}.get(self.dtype)
+        if precision is None:
+            # Even a disabled CPU autocast warns about any dtype but bfloat16
+            return nullcontext()
+        return torch.autocast(device_type=self.device, dtype=precision, cache_enabled=False)
     
-    def process_image(self, input_img):
+    @torch.inference_mode()
+    def process_image(self, input_img, rgb=False):
         """Process a single image with super resolution
         
         Args:
-            input_img: Input image as a numpy array (BGR)
+            input_img: Input image as a numpy array (BGR, or RGB when rgb is True)
+            rgb (bool): Take and return RGB instead of BGR (process_video's pipes are rgb24)
             
         Returns:
-            Super-resolved image as a numpy array (BGR)
+            Super-resolved image as a numpy array, in the same channel order as the input
         """
-        # Process the image with the model
+        # Process the image with the model; enhance() only knows fp16/fp32, so
+        # autocast is also what feeds a bf16 model bf16 inputs
         try:
-            output, _ = self.upsampler.enhance(input_img, outscale=self.scale)
-            return output
+            # enhance() always swaps BGR -> RGB itself, so hand it BGR
+            img = cv2.cvtColor(input_img, cv2.COLOR_RGB2BGR) if rgb else input_img
+            with self._autocast():
+                output, _ = self.upsampler.enhance(img, outscale=self.scale)
+            return cv2.cvtColor(output, cv2.COLOR_BGR2RGB) if rgb else output
         except Exception as e:
             print(f"Error during super resolution: {str(e)}")
             # Return original image if enhancement fails
             return input_img
     
-    def process_video(self, input_path, output_path=None, fps=None, chunk_size=30, progress=True):
+    def _quantize_int8(self, batch):
+        """Replace the model with a static INT8 version calibrated on batch"""
+        from torch.ao.quantization import get_default_qconfig_mapping
+        from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+        
+        try:
+            qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+            prepared = prepare_fx(self.upsampler.model.eval(), qconfig_mapping, example_inputs=(batch,))
+            prepared(batch)  # Calibrate activation ranges
+            self.upsampler.model = convert_fx(prepared)
+            print("Model quantized to INT8")
+        except Exception as e:
+            print(f"INT8 quantization failed, keeping the floating point model: {str(e)}")
+    
+    @staticmethod
+    def _dhash(frame):
+        """64-bit difference hash of an RGB frame: brightness gradients of a 9x8 thumbnail"""
+        thumb = cv2.cvtColor(cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA), cv2.COLOR_RGB2GRAY)
+        return int.from_bytes(np.packbits(thumb[:, 1:] > thumb[:, :-1]).tobytes(), 'big')
+    
+    @staticmethod
+    def _read_batches(decoder, shape, batch_size, batches, stop, dedupe_threshold=None):
+        """Read raw frames from an ffmpeg decoder into batches on a queue, ending with None
+        
+        Batches are (frames, repeats) pairs: each frame is written repeats[i] times.
+        With dedupe_threshold set, frames whose dHash is within that many bits of the
+        last kept frame are folded into its repeat count instead of being upscaled.
+        """
+        frame_bytes = shape[0] * shape[1] * shape[2]
+        try:
+            batch, repeats = [], []
+            last_hash = None
+            while not stop.is_set():
+                data = decoder.stdout.read(frame_bytes)
+                if not data or len(data) < frame_bytes:
+                    break
+                
+                frame = np.frombuffer(data, dtype=np.uint8).reshape(shape)
+                if dedupe_threshold is not None:
+                    frame_hash = SuperResolution._dhash(frame)
+                    if batch and bin(frame_hash ^ last_hash).count('1') <= dedupe_threshold:
+                        repeats[-1] += 1
+                        continue
+                    last_hash = frame_hash
+                
+                # Hand over a full batch only once the next kept frame shows up, so
+                # repeats of its last frame still land in its count
+                if len(batch) >= batch_size:
+                    batches.put((batch, repeats))
+                    batch, repeats = [], []
+                batch.append(frame)
+                repeats.append(1)
+            
+            if batch and not stop.is_set():
+                batches.put((batch, repeats))
+        finally:
+            batches.put(None)
+    
+    @staticmethod
+    def _write_frames(encoder, batches, stop, size):
+        """Write (frames, repeats) batches from a queue to an ffmpeg encoder until None
+        
+        The rawvideo pipe has no frame boundaries, so any frame that isn't size
+        (width, height), e.g. an input frame passed through when enhancement
+        failed, is resized to fit rather than shifting every frame after it.
+        """
+        width, height = size
+        try:
+            for frames, repeats in iter(batches.get, None):
+                for frame, count in zip(frames, repeats):
+                    if frame.shape[:2] != (height, width):
+                        frame = cv2.resize(frame, size, interpolation=cv2.INTER_LANCZOS4)
+                    data = np.ascontiguousarray(frame).data
+                    for _ in range(count):
+                        encoder.stdin.write(data)
+        except Exception:
+            # Stop the pipeline, but keep draining so the model thread never blocks
+            stop.set()
+            for _ in iter(batches.get, None):
+                pass
+            raise
+    
+    @staticmethod
+    def _tile_starts(length, tile):
+        """Offsets of tiles covering length, the last one shifted back to end flush"""
+        return list(range(0, length - tile, tile)) + [length - tile]
+    
+    @staticmethod
+    def _feather_window(height, width, ramp, like):
+        """Blend weights for one tile: raised-cosine ramps over the overlapping borders
+        
+        Adjacent ramps sum to exactly 1, so overlapping tiles cross-fade without seams.
+        """
+        def axis(n):
+            weight = torch.ones(n, device=like.device, dtype=like.dtype)
+            if ramp:
+                steps = torch.arange(ramp, device=like.device, dtype=torch.float32)
+                rise = (0.5 - 0.5 * torch.cos(torch.pi * (steps + 0.5) / ramp)).to(like.dtype)
+                weight[:ramp] = rise
+                weight[-ramp:] = rise.flip(0)
+            return weight
+        
+        return axis(height)[:, None] * axis(width)[None, :]
+    
+    @torch.inference_mode()
+    def _tiled_forward(self, batch):
+        """Run the model over overlapping tiles of each frame and stitch the results
+        
+        All tiles of a frame go through the model as one batch; the tile_pad
+        overlap gives every tile context at its borders and is feathered away.
+        """
+        model = self.upsampler.model
+        scale = self.upsampler.scale
+        pad = self.tile_pad
+        
+        count, channels, height, width = batch.shape
+        tile_h, tile_w = min(self.tile_size, height), min(self.tile_size, width)
+        pad = min(pad, height - 1, width - 1)  # reflect padding must be smaller than the frame
+        
+        padded = F.pad(batch, (pad, pad, pad, pad), 'reflect')
+        window_h, window_w = tile_h + 2 * pad, tile_w + 2 * pad
+        offsets = [(y, x) for y in self._tile_starts(height, tile_h) for x in self._tile_starts(width, tile_w)]
+        
+        weight = self._feather_window(window_h * scale, window_w * scale, 2 * pad * scale, batch)
+        output = batch.new_zeros((count, channels, (height + 2 * pad) * scale, (width + 2 * pad) * scale))
+        norm = batch.new_zeros(output.shape[2:])
+        for y, x in offsets:
+            norm[y * scale:(y + window_h) * scale, x * scale:(x + window_w) * scale] += weight
+        
+        for i in range(count):
+            tiles = torch.cat([padded[i:i + 1, :, y:y + window_h, x:x + window_w] for y, x in offsets])
+            if self.channels_last:
+                tiles = tiles.contiguous(memory_format=torch.channels_last)
+            result = model(tiles)
+            for tile, (y, x) in zip(result, offsets):
+                output[i, :, y * scale:(y + window_h) * scale, x * scale:(x + window_w) * scale] += tile * weight
+        
+        output /= norm
+        return output[:, :, pad * scale:(pad + height) * scale, pad * scale:(pad + width) * scale]
+    
+    def _shape_buffers(self, frames):
+        """Return the cached buffers for a batch of frames, and whether it's a short batch
+        
+        A short batch (e.g. the last one of a video) borrows the buffers of the full-sized
+        batch with the same frame size instead of getting an entry of its own.
+        """
+        height, width = frames[0].shape[:2]
+        count = len(frames)
+        
+        for key, buffers in self._shape_cache.items():
+            if key[:2] == (height, width) and key[2] > count:
+                self._shape_cache.move_to_end(key)
+                return buffers, True
+        
+        key = (height, width, count)
+        if key not in self._shape_cache:
+            self._shape_cache[key] = {'pinned': None, 'graph': None, 'trt': None}
+            if len(self._shape_cache) > 4:
+                self._shape_cache.popitem(last=False)
+        self._shape_cache.move_to_end(key)
+        return self._shape_cache[key], False
+    
+    def _capture_graph(self, batch):
+        """Record the model's forward pass for batches shaped like batch into a CUDA graph"""
+        model = self.upsampler.model
+        static_input = batch.clone()
+        
+        # Warm up on a side stream so lazy initialisation (cuDNN autotuning etc.)
+        # happens outside the capture
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(3):
+                model(static_input)
+        torch.cuda.current_stream().wait_stream(side_stream)
+        
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_output = model(static_input)
+        return graph, static_input, static_output
+    
+    def _trt_module(self, batch):
+        """Load or build the TensorRT engine for batches shaped like batch
+        
+        Engines are specialised to one input shape, so they're cached on disk next to
+        the model weights, e.g. realesr-animevideov3_x2_4x3x720x1280_fp16.ts
+        """
+        # Also registers the TensorRT runtime ops that a cached engine needs to load
+        import torch_tensorrt
+        
+        shape = tuple(batch.shape)
+        cache_dir = os.path.join(os.path.expanduser('~'), '.cache/realesrgan')
+        engine_path = os.path.join(cache_dir, f"{self.model_name}_x{self.upsampler.scale}_"
+                                              f"{'x'.join(map(str, shape))}_{self.dtype}.ts")
+        if os.path.exists(engine_path):
+            return torch.jit.load(engine_path).to(self.device)
+        
+        print(f"Building TensorRT engine for input {shape}, this can take a few minutes...")
+        precision = {'fp16': torch.float16, 'bf16': torch.bfloat16}.get(self.dtype, torch.float32)
+        module = torch_tensorrt.compile(
+            torch.jit.trace(self.upsampler.model, batch),
+            ir='torchscript',
+            inputs=[torch_tensorrt.Input(shape, dtype=batch.dtype)],
+            enabled_precisions={precision},
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.jit.save(module, engine_path)
+        return module
+    
+    def _forward(self, batch, buffers, short):
+        """Run the model on a batch through TensorRT or a replayed CUDA graph when enabled"""
+        if self.engine == 'trt' and not short:
+            if buffers['trt'] is None:
+                try:
+                    buffers['trt'] = self._trt_module(batch.contiguous())
+                except ImportError as e:
+                    print(f"torch-tensorrt could not be imported, running the model in PyTorch: {str(e)}")
+                    self.engine = 'torch'
+                    return self.upsampler.model(batch)
+                except Exception as e:
+                    print(f"TensorRT engine build failed, running the model in PyTorch: {str(e)}")
+                    self.engine = 'torch'
+                    return self.upsampler.model(batch)
+            return buffers['trt'](batch.contiguous())
+        
+        # The short last batch of a video isn't worth a capture of its own
+        if not self.cuda_graphs or short:
+            return self.upsampler.model(batch)
+        
+        if buffers['graph'] is None:
+            try:
+                buffers['graph'] = self._capture_graph(batch)
+            except Exception as e:
+                print(f"CUDA graph capture failed, running the model eagerly: {str(e)}")
+                self.cuda_graphs = False
+                return self.upsampler.model(batch)
+        
+        graph, static_input, static_output = buffers['graph']
+        static_input.copy_(batch)
+        graph.replay()
+        # The next replay overwrites static_output in place
+        return static_output.clone()
+    
+    def _upload(self, frames, buffers):
+        """Copy a list of same-sized uint8 frames to the device as one BHWC tensor
+        
+        On CUDA the frames are stacked straight into one of three rotating pinned
+        buffers and uploaded asynchronously on the upload stream, which the calling
+        (compute) stream then waits on; elsewhere they're just stacked.
+        """
+        if self.device != 'cuda':
+            return torch.from_numpy(np.stack(frames))
+        
+        count = len(frames)
+        if buffers['pinned'] is None:
+            buffers['pinned'] = [torch.empty((count,) + frames[0].shape, dtype=torch.uint8, pin_memory=True)
+                                 for _ in range(3)]
+            buffers['uploaded'] = [None] * 3
+            buffers['slot'] = 0
+        
+        # Batches are in flight while the next ones are staged, so wait until this
+        # slot's last upload has finished before overwriting it
+        slot = buffers['slot']
+        buffers['slot'] = (slot + 1) % 3
+        if buffers['uploaded'][slot] is not None:
+            buffers['uploaded'][slot].synchronize()
+        
+        staging = buffers['pinned'][slot][:count]
+        np.stack(frames, out=staging.numpy())
+        
+        compute_stream = torch.cuda.current_stream()
+        with torch.cuda.stream(self._upload_stream):
+            batch = staging.to(self.device, non_blocking=True)
+            uploaded = torch.cuda.Event()
+            uploaded.record()
+        buffers['uploaded'][slot] = uploaded
+        compute_stream.wait_event(uploaded)
+        batch.record_stream(compute_stream)
+        return batch
+    
+    def process_batch(self, frames, rgb=False):
+        """Process a batch of same-sized frames with one forward pass of the model
+        
+        Mirrors RealESRGANer.enhance (pre-padding, mod padding, outscale resize)
+        but stacks the frames so the GPU works on the whole batch per launch.
+        
+        Args:
+            frames: List of input frames as numpy arrays (uint8, BGR or RGB when rgb is True)
+            rgb (bool): Take and return RGB instead of BGR (process_video's pipes are rgb24)
+            
+        Returns:
+            List of super-resolved frames as numpy arrays (uint8), in the same channel
+            order as the input
+        """
+        return self._collect_batch(self._submit_batch(frames, rgb))
+    
+    @torch.inference_mode()
+    def _submit_batch(self, frames, rgb=False):
+        """Queue a batch's upload, forward pass and download without waiting for them
+        
+        Returns a pending batch for _collect_batch. On CUDA the work runs on the
+        upload/compute/download streams, so the caller can submit the next batch
+        before collecting this one.
+        """
+        try:
+            buffers, short = self._shape_buffers(frames)
+            compute = torch.cuda.stream(self._compute_stream) if self._compute_stream is not None else nullcontext()
+            with compute:
+                output = self._upscale_on_device(frames, buffers, short, rgb)
+                height, width = frames[0].shape[:2]
+            
+            if self._download_stream is None:
+                host, downloaded = output.cpu(), None
+            else:
+                # Copy the result back on the download stream once the compute stream
+                # is done with it; pinned memory comes from PyTorch's caching host allocator
+                host = torch.empty(output.shape, dtype=torch.uint8, pin_memory=True)
+                self._download_stream.wait_stream(self._compute_stream)
+                with torch.cuda.stream(self._download_stream):
+                    host.copy_(output, non_blocking=True)
+                    downloaded = torch.cuda.Event()
+                    downloaded.record()
+                output.record_stream(self._download_stream)
+        except Exception as e:
+            if self._eager_model is not None:
+                print(f"Compiled model failed, switching back to eager mode: {str(e)}")
+                self.upsampler.model = self._eager_model
+                self._eager_model = None
+                return self._submit_batch(frames, rgb)
+            
+            print(f"Error during batched super resolution, falling back to single frames: {str(e)}")
+            return {'frames': frames, 'result': [self.process_image(frame, rgb) for frame in frames]}
+        
+        return {'frames': frames, 'rgb': rgb, 'host': host, 'downloaded': downloaded,
+                'size': (width * self.scale, height * self.scale)}
+    
+    def _collect_batch(self, pending):
+        """Wait for a batch from _submit_batch and return its frames as numpy arrays"""
+        if 'result' in pending:
+            return pending['result']
+        
+        try:
+            if pending['downloaded'] is not None:
+                pending['downloaded'].synchronize()
+        except Exception as e:
+            print(f"Error during batched super resolution, falling back to single frames: {str(e)}")
+            return [self.process_image(frame, pending['rgb']) for frame in pending['frames']]
+        
+        output = pending['host'].numpy()
+        
+        # Match enhance(): resize when the requested scale differs from the model's
+        if self.scale != self.upsampler.scale:
+            return [cv2.resize(frame, pending['size'], interpolation=cv2.INTER_LANCZOS4) for frame in output]
+        return list(output)
+    
+    def _upscale_on_device(self, frames, buffers, short, rgb=False):
+        """Upload frames and run the model, returning BHWC uint8 frames on the device"""
+        upsampler = self.upsampler
+        
+        # BHWC uint8 -> BCHW float RGB in [0, 1], uploaded in one copy; the model
+        # works in RGB, so BGR frames get their channels swapped on the device
+        batch = self._upload(frames, buffers).to(upsampler.device)
+        if not rgb:
+            batch = batch[..., [2, 1, 0]]
+        batch = batch.permute(0, 3, 1, 2).float().div_(255.0)
+        if upsampler.half:
+            batch = batch.half()
+        elif self.dtype == 'bf16':
+            batch = batch.to(torch.bfloat16)
+        
+        _, _, height, width = batch.shape
+        
+        # Same padding as RealESRGANer.pre_process, removed again after the forward pass
+        if upsampler.pre_pad != 0:
+            batch = F.pad(batch, (0, upsampler.pre_pad, 0, upsampler.pre_pad), 'reflect')
+        mod_scale = 2 if upsampler.scale == 2 else (4 if upsampler.scale == 1 else None)
+        if mod_scale is not None:
+            pad_h = (mod_scale - batch.shape[2] % mod_scale) % mod_scale
+            pad_w = (mod_scale - batch.shape[3] % mod_scale) % mod_scale
+            if pad_h or pad_w:
+                batch = F.pad(batch, (0, pad_w, 0, pad_h), 'reflect')
+        
+        if self.channels_last:
+            batch = batch.contiguous(memory_format=torch.channels_last)
+        
+        if self._int8_pending:
+            self._int8_pending = False
+            self._quantize_int8(batch)
+        
+        with self._autocast():
+            if self.tile_size and max(batch.shape[2:]) > self.tile_size:
+                output = self._tiled_forward(batch)
+            else:
+                output = self._forward(batch, buffers, short)
+        output = output[:, :, :height * upsampler.scale, :width * upsampler.scale]
+        
+        # BCHW float RGB -> BHWC uint8 on the device, so only the uint8
+        # pixels (a fraction of the float tensor's size) cross back to the host
+        output = output.float().clamp_(0, 1).mul_(255.0).round_().to(torch.uint8)
+        if not rgb:
+            output = output[:, [2, 1, 0]]
+        return output.permute(0, 2, 3, 1).contiguous()
+    
+    def process_video(self, input_path, output_path=None, fps=None, chunk_size=30, progress=True, batch_size=4,
+                      dedupe_threshold=None):
         """Process a video with super resolution
         
         Args:
             input_path (str): Path to input video
             output_path (str, optional): Path to output video. If None, will be inferred
             fps (int, optional): Output FPS. If None, use original FPS
-            chunk_size (int): Number of frames to process at once
+            chunk_size (int): Roughly how many decoded frames may be buffered ahead of the model
             progress (bool): Whether to show progress bar
+            batch_size (int): Number of frames sent through the model per forward pass
+            dedupe_threshold (int, optional): Reuse the previous upscaled frame when a frame's
+                                              dHash differs by at most this many bits (0-64);
+                                              None upscales every frame
             
         Returns:
             Path to processed video
         """
         input_path = Path(input_path)
+        batch_size = max(1, batch_size)
         
         # Determine output path if not provided
         if output_path is None:
@@ -133,14 +737,12 @@ class SuperResolution:
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Open the video
-        cap = cv2.VideoCapture(str(input_path))
-        
-        # Get video properties
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        original_fps = cap.get(cv2.CAP_PROP_FPS)
+        # Read the video properties
+        width, height, total_frames, original_fps = probe_video(input_path)
+        if width <= 0 or height <= 0 or (fps is None and not original_fps > 0):
+            # Unreadable or corrupt input; the raw pipes below need a real frame size
+            print(f"Error during video encoding: could not read video properties of {input_path}")
+            return str(input_path)  # Return original path on error
         
         # Use original FPS if not specified
         if fps is None:
@@ -154,84 +756,133 @@ class SuperResolution:
         print(f"Original size: {width}x{height}, New size: {new_width}x{new_height}")
         print(f"Total frames: {total_frames}, FPS: {fps}")
         
-        # Use temporary directory for frames
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_dir = Path(temp_dir)
-            
-            # Setup progress bar
-            if progress:
-                pbar = tqdm(total=total_frames, desc="Processing frames")
-            
-            frame_count = 0
-            frames_processed = 0
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Process the frame
-                upscaled_frame = self.process_image(frame)
-                
-                # Save the frame to temp directory
-                cv2.imwrite(str(temp_dir / f"frame_{frame_count:08d}.png"), upscaled_frame)
-                
-                frame_count += 1
-                frames_processed += 1
-                
-                if progress:
-                    pbar.update(1)
+        # Determine video codec based on output file extension
+        if output_path.suffix.lower() in ['.mp4', '.m4v']:
+            codec = 'libx264'
+            pix_fmt = 'yuv420p'
+        elif output_path.suffix.lower() in ['.webm']:
+            codec = 'libvpx-vp9'
+            pix_fmt = 'yuv420p'
+        else:
+            # Default to mp4
+            codec = 'libx264'
+            pix_fmt = 'yuv420p'
+        
+        # Hand H.264 encoding (and decoding) to the GPU's video engine when we're on CUDA
+        use_nvenc = codec == 'libx264' and (
+            self.encoder == 'nvenc' or
+            (self.encoder == 'auto' and self.device == 'cuda' and ffmpeg_has_encoder('h264_nvenc'))
+        )
+        if use_nvenc:
+            codec = 'h264_nvenc'
+            quality_args = ['-preset', 'p4', '-rc', 'vbr', '-cq', '23', '-b:v', '0']
+        else:
+            quality_args = [
+                '-preset', 'slow',  # Slower preset for better compression
+                '-crf', '23',  # Constant Rate Factor (lower is better quality, 18-28 is good range)
+            ]
+        
+        # Frames stream through two ffmpeg processes as raw RGB, the model's own
+        # channel order, so no channel swap is needed on either side
+        decode_cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',
+            *(['-hwaccel', 'cuda'] if use_nvenc else []),
+            '-i', str(input_path),
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-'
+        ]
+        encode_cmd = [
+            'ffmpeg',
+            '-y',  # Overwrite output file if it exists
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f'{new_width}x{new_height}',
+            '-framerate', str(fps),
+            '-i', '-',
+            '-c:v', codec,
+            '-pix_fmt', pix_fmt,
+            *quality_args,
+            '-r', str(fps),
+            str(output_path)
+        ]
+        
+        decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE, bufsize=1 << 20)
+        encoder = subprocess.Popen(encode_cmd, stdin=subprocess.PIPE, bufsize=1 << 20)
+        
+        # Decoding, upscaling and encoding overlap: a reader thread batches decoded
+        # frames, this thread runs the model and a writer thread feeds the encoder.
+        # Bounded queues cap how far ahead the reader gets (about chunk_size frames)
+        stop = threading.Event()
+        read_queue = queue.Queue(maxsize=max(1, chunk_size // batch_size))
+        write_queue = queue.Queue(maxsize=2)
+        
+        # Setup progress bar
+        if progress:
+            pbar = tqdm(total=total_frames, desc="Processing frames")
+        
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                reader = executor.submit(self._read_batches, decoder, (height, width, 3), batch_size, read_queue, stop,
+                                         dedupe_threshold)
+                writer = executor.submit(self._write_frames, encoder, write_queue, stop,
+                                         (new_width, new_height))
                 
-                # Process in chunks to avoid memory issues and provide better progress feedback
-                if frames_processed >= chunk_size or frame_count >= total_frames:
-                    if frame_count >= total_frames:
-                        break
+                batch = []
+                pending = None
+                try:
+                    while not stop.is_set():
+                        batch = read_queue.get()
+                        
+                        # Queue this batch on the GPU before waiting for the previous one,
+                        # so its upload and forward pass overlap the previous download
+                        # (a full batch at once, the last one may be shorter)
+                        submitted = None
+                        if batch is not None:
+                            frames, repeats = batch
+                            submitted = (self._submit_batch(frames, rgb=True), repeats)
+                        if pending is not None:
+                            upscaled, repeats = pending
+                            write_queue.put((self._collect_batch(upscaled), repeats))
+                            if progress:
+                                pbar.update(sum(repeats))
+                        pending = submitted
+                        
+                        if batch is None:
+                            break
+                finally:
+                    # Unblock the reader if we stopped early, then let the writer finish
+                    stop.set()
+                    while batch is not None:
+                        batch = read_queue.get()
+                    write_queue.put(None)
             
+            for future in (reader, writer):
+                if future.exception() is not None:
+                    print(f"Error during video encoding: {str(future.exception())}")
+        finally:
             if progress:
                 pbar.close()
             
-            # Use FFmpeg to combine frames into video
-            print("Combining frames into video...")
-            
-            # Determine video codec based on output file extension
-            if output_path.suffix.lower() in ['.mp4', '.m4v']:
-                codec = 'libx264'
-                pix_fmt = 'yuv420p'
-            elif output_path.suffix.lower() in ['.webm']:
-                codec = 'libvpx-vp9'
-                pix_fmt = 'yuv420p'
-            else:
-                # Default to mp4
-                codec = 'libx264'
-                pix_fmt = 'yuv420p'
-            
-            # FFmpeg command to combine frames
-            ffmpeg_cmd = [
-                'ffmpeg',
-                '-y',  # Overwrite output file if it exists
-                '-framerate', str(fps),
-                '-i', str(temp_dir / 'frame_%08d.png'),
-                '-c:v', codec,
-                '-pix_fmt', pix_fmt,
-                '-preset', 'slow',  # Slower preset for better compression
-                '-crf', '23',  # Constant Rate Factor (lower is better quality, 18-28 is good range)
-                '-r', str(fps),
-                str(output_path)
-            ]
-            
-            # Run FFmpeg
             try:
-                subprocess.run(ffmpeg_cmd, check=True)
-                print(f"Super resolution complete: {output_path}")
-                return str(output_path)
-            except subprocess.CalledProcessError as e:
-                print(f"Error during video encoding: {str(e)}")
-                return str(input_path)  # Return original path on error
-            finally:
-                cap.release()
+                encoder.stdin.close()
+            except OSError:
+                pass
+            encoder.wait()
+            decoder.stdout.close()
+            decoder.wait()
+        
+        if encoder.returncode != 0 or decoder.returncode != 0:
+            print(f"Error during video encoding: ffmpeg exited with status {encoder.returncode or decoder.returncode}")
+            return str(input_path)  # Return original path on error
+        
+        print(f"Super resolution complete: {output_path}")
+        return str(output_path)
     
     def batch_process_directory(self, input_dir, output_dir=None, file_types=('.mp4', '.webm', '.mkv'), 
-                                recursive=False, skip_existing=True):
+                                recursive=False, skip_existing=True, batch_size=4, dedupe_threshold=None):
         """Process all videos in a directory
         
         Args:
@@ -240,6 +891,8 @@ class SuperResolution:
             file_types (tuple): File extensions to process
             recursive (bool): Whether to process subdirectories
             skip_existing (bool): Whether to skip existing output files
+            batch_size (int): Number of frames sent through the model per forward pass
+            dedupe_threshold (int, optional): See process_video
             
         Returns:
             List of processed video paths
@@ -254,15 +907,9 @@ class SuperResolution:
         # Ensure output directory exists
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Find all videos
-        if recursive:
-            video_files = []
-            for ext in file_types:
-                video_files.extend(list(input_dir.glob(f'**/*{ext}')))
-        else:
-            video_files = []
-            for ext in file_types:
-                video_files.extend(list(input_dir.glob(f'*{ext}')))
+        # Find all videos in one pass over the tree, rather than one glob per extension
+        ext_set = {ext.lower() for ext in file_types}
+        video_files = sorted(scan_videos(input_dir, ext_set, recursive, exclude=output_dir))
         
         processed_videos = []
         
@@ -286,13 +933,28 @@ class SuperResolution:
             
             try:
                 # Process the video
-                processed_path = self.process_video(video_file, output_path)
+                processed_path = self.process_video(video_file, output_path, batch_size=batch_size,
+                                                    dedupe_threshold=dedupe_threshold)
                 processed_videos.append(processed_path)
             except Exception as e:
                 print(f"Error processing {video_file}: {str(e)}")
         
         return processed_videos
 
+def positive_int(value):
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def hash_distance(value):
+    """argparse type for a Hamming distance between two 64-bit hashes (0-64)"""
+    number = int(value)
+    if not 0 <= number <= 64:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 64, got {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="Super Resolution for Anime Videos")
     parser.add_argument("input", help="Input video file or directory")
@@ -310,6 +972,29 @@ def main():
                         help="Process subdirectories when using batch mode")
     parser.add_argument("--device", choices=["auto", "cuda", "cpu"], default="auto",
                         help="Device to use for processing")
+    parser.add_argument("--encoder", choices=["auto", "nvenc", "cpu"], default="auto",
+                        help="Video encoder (auto uses NVENC when running on CUDA)")
+    parser.add_argument("--channels-last", action="store_true",
+                        help="Run the model in channels-last (NHWC) memory format")
+    parser.add_argument("--compile", action="store_true",
+                        help="Compile the model with torch.compile for faster CUDA inference")
+    parser.add_argument("--int8", action="store_true",
+                        help="Quantize the model to INT8 for faster CPU inference")
+    parser.add_argument("--batch-size", type=positive_int, default=4,
+                        help="Frames upscaled per model forward pass (lower this if you run out of GPU memory)")
+    parser.add_argument("--cuda-graphs", action="store_true",
+                        help="Replay the model forward pass from a captured CUDA graph")
+    parser.add_argument("--dedupe-threshold", type=hash_distance, default=None,
+                        help="Reuse the previous upscaled frame for frames whose 64-bit dHash differs "
+                             "by at most this many bits (0 = identical hashes; off by default)")
+    parser.add_argument("--dtype", choices=["auto", "fp32", "fp16", "bf16"], default="auto",
+                        help="Model precision (auto uses fp16 on CUDA and fp32 on CPU)")
+    parser.add_argument("--engine", choices=["torch", "trt"], default="torch",
+                        help="Inference engine (trt builds a cached TensorRT engine per frame size)")
+    parser.add_argument("--tile", type=int, default=0,
+                        help="Split frames larger than this many pixels into tiles (0 disables tiling)")
+    parser.add_argument("--tile-pad", type=int, default=10,
+                        help="Overlap in pixels between neighbouring tiles")
     
     args = parser.parse_args()
     
@@ -319,7 +1004,11 @@ def main():
     # Initialize super resolution
     try:
         sr = SuperResolution(model_name=model_name, device=args.device, 
-                             scale=args.scale, denoise_strength=args.denoise)
+                             scale=args.scale, denoise_strength=args.denoise, encoder=args.encoder,
+                             channels_last=args.channels_last, compile_model=args.compile,
+                             quantize="int8" if args.int8 else None,
+                             tile_size=args.tile, tile_pad=args.tile_pad, cuda_graphs=args.cuda_graphs,
+                             dtype=args.dtype, engine=args.engine)
         
         input_path = Path(args.input)
         
@@ -330,7 +1019,8 @@ def main():
             else:
                 output_dir = input_path / f"upscaled_{args.scale}x"
             
-            sr.batch_process_directory(input_path, output_dir, recursive=args.recursive)
+            sr.batch_process_directory(input_path, output_dir, recursive=args.recursive, batch_size=args.batch_size,
+                                      dedupe_threshold=args.dedupe_threshold)
         else:
             # Process single file
             if args.output:
@@ -340,7 +1030,8 @@ def main():
                 filename = input_path.stem + f"_upscaled_{args.scale}x{input_path.suffix}"
                 output_path = input_path.parent / filename
             
-            sr.process_video(input_path, output_path, fps=args.fps)
+            sr.process_video(input_path, output_path, fps=args.fps, batch_size=args.batch_size,
+                             dedupe_threshold=args.dedupe_threshold)
         
     except Exception as e:
         print(f"Error: {str(e)}")